@@ -1,7 +1,7 @@
 
 from typing import Any, Dict, List, Optional, Tuple
 from fastapi import FastAPI, UploadFile, File, Form, Request, HTTPException
-from fastapi.responses import JSONResponse, RedirectResponse, HTMLResponse
+from fastapi.responses import JSONResponse, RedirectResponse, HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
@@ -15,6 +15,7 @@ import sys
 import re
 import time
 import json
+import logging
 import requests
 from dotenv import load_dotenv
 import secrets
@@ -170,6 +171,8 @@ POCKET_OPTION_SUGGESTIONS = sorted({
 # --- Signal pair test script path ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 FUTURE_SIGNAL_SCRIPT = os.path.join(SCRIPT_DIR, "future_signal.py")
+# Run the cataloger inside this process (warm session) instead of spawning future_signal.py.
+FUTURE_SIGNAL_IN_PROCESS = (os.getenv("FUTURE_SIGNAL_IN_PROCESS", "1") or "1").strip().lower() not in ("0", "false", "no")
 START_IMAGE_UPLOAD_DIR = os.path.join(BASE_DIR, "uploads", "start-images")
 ALLOWED_START_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 MAX_START_IMAGE_BYTES = 8 * 1024 * 1024
@@ -750,6 +753,35 @@ app.add_middleware(
 )
 
 scheduled_worker_task: Optional[asyncio.Task] = None
+signal_prewarm_task: Optional[asyncio.Task] = None
+
+# --- Future signal pre-warming ---
+# Regenerates every active signal pair right after each bar boundary so the bot's
+# Future Signal requests are cache hits (share SIGNAL_CACHE_PATH with the bot).
+SIGNAL_PREWARM_ENABLED = env_bool("SIGNAL_PREWARM_ENABLED", False)
+try:
+    SIGNAL_PREWARM_TIMEFRAMES = sorted({
+        int(tf) for tf in (os.getenv("SIGNAL_PREWARM_TIMEFRAMES", "1,5,15") or "1,5,15").split(",") if tf.strip()
+    } & {1, 2, 5, 15, 30, 60})
+except ValueError:
+    SIGNAL_PREWARM_TIMEFRAMES = [1, 5, 15]
+try:
+    SIGNAL_PREWARM_CONCURRENCY = max(1, int(os.getenv("SIGNAL_PREWARM_CONCURRENCY", "2") or "2"))
+except ValueError:
+    SIGNAL_PREWARM_CONCURRENCY = 2
+try:
+    SIGNAL_PREWARM_BUDGET_SECONDS = float(os.getenv("SIGNAL_PREWARM_BUDGET_SECONDS", "40") or "40")
+except ValueError:
+    SIGNAL_PREWARM_BUDGET_SECONDS = 40.0
+try:
+    SIGNAL_PREWARM_DELAY_SECONDS = float(os.getenv("SIGNAL_PREWARM_DELAY_SECONDS", "2") or "2")
+except ValueError:
+    SIGNAL_PREWARM_DELAY_SECONDS = 2.0
+# Same parameters as the bot's Future Signal button, so the cache keys match.
+SIGNAL_PREWARM_DAYS = 10
+SIGNAL_PREWARM_MARTINGALE = 0
+SIGNAL_PREWARM_PERCENTAGE = 70
+signal_prewarm_last: Dict[str, Any] = {}
 
 
 @app.on_event("startup")
@@ -759,6 +791,34 @@ async def start_scheduled_worker():
         scheduled_worker_task = asyncio.create_task(_scheduled_broadcast_worker())
 
 
+@app.on_event("startup")
+async def start_signal_prewarm():
+    global signal_prewarm_task
+    if not SIGNAL_PREWARM_ENABLED or not SIGNAL_PREWARM_TIMEFRAMES:
+        return
+    engine = get_future_signal_engine()
+    if engine is None or engine.cache is None or not engine.cache.path:
+        # Without a shared SQLite cache the warmed results would stay in this process, unseen by the bot.
+        logging.warning("SIGNAL_PREWARM_ENABLED is set but SIGNAL_CACHE_PATH is empty; not pre-warming signals.")
+        return
+    if signal_prewarm_task is None or signal_prewarm_task.done():
+        signal_prewarm_task = asyncio.create_task(_signal_prewarm_worker())
+
+
+@app.on_event("shutdown")
+async def stop_signal_prewarm():
+    global signal_prewarm_task
+    if not signal_prewarm_task:
+        return
+    signal_prewarm_task.cancel()
+    try:
+        await signal_prewarm_task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        signal_prewarm_task = None
+
+
 @app.on_event("shutdown")
 async def stop_scheduled_worker():
     global scheduled_worker_task
@@ -1015,6 +1075,29 @@ async def upload_menu_image(request: Request, file: UploadFile = File(...)):
     payload = image_setting_payload(new_value)
     return {"ok": True, "url": payload["url"], "value": payload["value"], "mode": BOT_MODE}
 
+# --- All start/menu settings in one response (used by bot /start and /menu) ---
+@app.get("/settings/start-bundle")
+def get_start_settings_bundle(request: Request):
+    media = {
+        "promo_image": get_promo_image(),
+        "promo_video": get_promo_video(),
+        "welcome_image": get_welcome_image(),
+        "welcome_video": get_welcome_video(),
+        "menu_image": get_menu_image(),
+    }
+    bundle = {
+        "mode": BOT_MODE,
+        "start_message": get_start_message()["message"],
+        "future_signal_lock_message": get_future_signal_lock_message()["message"],
+        **{name: {"url": item["url"], "value": item["value"]} for name, item in media.items()},
+    }
+    # The version is a hash of the content, so any settings change produces a new one.
+    version = hashlib.sha256(json.dumps(bundle, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+    etag = f'"{version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse({**bundle, "version": version}, headers={"ETag": etag})
+
 # --- Currency price endpoint ---
 @app.get("/currency/pair/{pair}")
 def currency_pair(pair: str):
@@ -1141,6 +1224,39 @@ async def store_user(request: Request):
         conn.commit()
     return {"ok": True}
 
+# --- Store a batch of users in one transaction (used by bot) ---
+@app.post("/user/store/bulk")
+async def store_users_bulk(request: Request):
+    try:
+        data = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON.")
+    users = data.get("users") if isinstance(data, dict) else None
+    if not isinstance(users, list):
+        raise HTTPException(status_code=400, detail='Body must be an object with a "users" list.')
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    latest = {}
+    for item in users:
+        if not isinstance(item, dict) or not isinstance(item.get("telegram_id"), (int, str)):
+            continue
+        latest[item["telegram_id"]] = (
+            item["telegram_id"],
+            item.get("username", "Unknown"),
+            item.get("last_message_time", now),
+        )
+    if latest:
+        with sqlite3.connect(DB_NAME) as conn:
+            c = conn.cursor()
+            c.executemany("""
+                INSERT INTO users (telegram_id, username, last_message_time)
+                VALUES (?, ?, ?)
+                ON CONFLICT(telegram_id) DO UPDATE SET
+                    username=excluded.username,
+                    last_message_time=excluded.last_message_time
+            """, list(latest.values()))
+            conn.commit()
+    return {"ok": True, "stored": len(latest)}
+
 # --- Get reply for text (used by bot_webhook) ---
 @app.post("/reply/get")
 async def reply_get(request: Request):
@@ -1848,6 +1964,83 @@ async def _scheduled_broadcast_worker() -> None:
             await asyncio.sleep(SCHEDULE_MEDIA_POLL_SECONDS)
 
 
+def _active_signal_pair_names() -> List[str]:
+    with sqlite3.connect(DB_NAME) as conn:
+        c = conn.cursor()
+        c.execute("SELECT pair_name FROM signal_pairs WHERE active=1 ORDER BY sort_order, id")
+        return [r[0] for r in c.fetchall()]
+
+
+async def prewarm_signal_pairs(
+    timeframes: List[int], engine=None, pairs: Optional[List[str]] = None
+) -> Dict[str, int]:
+    """Generate and cache signals for every active pair x timeframe.
+
+    At most SIGNAL_PREWARM_CONCURRENCY generations run at once and jobs that
+    cannot start within SIGNAL_PREWARM_BUDGET_SECONDS are skipped, so a cycle
+    leaves room for interactive requests and never runs into the next bar.
+    The analysis runs on the engine's CatalogPool, or on a worker thread,
+    never on the event loop.
+    """
+    stats = {"warmed": 0, "skipped": 0, "failed": 0}
+    engine = engine or get_future_signal_engine()
+    if engine is None or engine.cache is None:
+        return stats
+    if pairs is None:
+        pairs = await asyncio.to_thread(_active_signal_pair_names)
+
+    import future_signal
+
+    pool = engine.pool or future_signal.CatalogThreads()
+    deadline = time.monotonic() + SIGNAL_PREWARM_BUDGET_SECONDS
+    semaphore = asyncio.Semaphore(SIGNAL_PREWARM_CONCURRENCY)
+
+    async def _warm(pair_name: str, timeframe: int) -> None:
+        async with semaphore:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                stats["skipped"] += 1
+                return
+            try:
+                await asyncio.wait_for(
+                    engine.generate(
+                        pair_name.replace("_OTC", "_otc"),
+                        timeframe=timeframe,
+                        days=SIGNAL_PREWARM_DAYS,
+                        martingale=SIGNAL_PREWARM_MARTINGALE,
+                        percentage=SIGNAL_PREWARM_PERCENTAGE,
+                        pool=pool,
+                    ),
+                    timeout=remaining,
+                )
+                stats["warmed"] += 1
+            except Exception:
+                stats["failed"] += 1
+
+    await asyncio.gather(*(_warm(pair, tf) for tf in timeframes for pair in pairs))
+    return stats
+
+
+async def _signal_prewarm_worker() -> None:
+    while True:
+        try:
+            # Cached results are valid until their next bar, so warm right after the boundary.
+            now = time.time()
+            boundary = min((int(now) // (tf * 60) + 1) * tf * 60 for tf in SIGNAL_PREWARM_TIMEFRAMES)
+            await asyncio.sleep(max(0.0, boundary + SIGNAL_PREWARM_DELAY_SECONDS - now))
+            due = [tf for tf in SIGNAL_PREWARM_TIMEFRAMES if boundary % (tf * 60) == 0]
+            started = time.monotonic()
+            stats = await prewarm_signal_pairs(due)
+            signal_prewarm_last.clear()
+            signal_prewarm_last.update(
+                stats, timeframes=due, at=_to_utc_iso(_utc_now()), seconds=round(time.monotonic() - started, 2)
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await asyncio.sleep(SCHEDULE_MEDIA_POLL_SECONDS)
+
+
 # --- Send message, images, and videos to multiple users ---
 @app.post("/send/all/bulk")
 async def send_all_bulk(
@@ -2814,16 +3007,36 @@ def get_valid_pairs():
     """Return suggestion list for autocomplete (NOT enforced)."""
     return {"valid_pairs": POCKET_OPTION_SUGGESTIONS}
 
-@app.post("/signal-pairs/test")
-async def test_signal_pair(request: Request):
-    """Test if a pair actually works on PocketOption by running future_signal.py."""
-    require_login(request)
-    require_csrf(request)
-    data = await request.json()
-    pair_name = (data.get("pair_name") or "").strip().upper()
-    if not pair_name:
-        raise HTTPException(status_code=400, detail="Pair name is required.")
-    asset_name = pair_name.replace("_OTC", "_otc")
+_future_signal_engine = None
+_future_signal_engine_failed = False
+
+def get_future_signal_engine():
+    """Return the shared in-process signal engine, or None to use the subprocess."""
+    global _future_signal_engine, _future_signal_engine_failed
+    if not FUTURE_SIGNAL_IN_PROCESS or _future_signal_engine_failed:
+        return None
+    if _future_signal_engine is None:
+        try:
+            import future_signal
+        except (ImportError, SystemExit):
+            _future_signal_engine_failed = True
+            return None
+        _future_signal_engine = future_signal.get_engine()
+    return _future_signal_engine
+
+@app.on_event("shutdown")
+async def close_future_signal_engine():
+    global _future_signal_engine
+    if _future_signal_engine is not None:
+        engine, _future_signal_engine = _future_signal_engine, None
+        await engine.close()
+
+def _signal_pair_test_result(pair_name: str, has_signals: bool) -> dict:
+    if has_signals:
+        return {"valid": True, "message": f"'{pair_name}' works! Signals found."}
+    return {"valid": True, "message": f"'{pair_name}' is accepted by PocketOption but no signals right now (market may be closed)."}
+
+def _test_signal_pair_subprocess(pair_name: str, asset_name: str) -> dict:
     cmd = [
         sys.executable, FUTURE_SIGNAL_SCRIPT,
         "--assets", asset_name,
@@ -2831,6 +3044,7 @@ async def test_signal_pair(request: Request):
         "--percentage", "70",
         "--days", "1",
         "--martingale", "0",
+        "--format", "json",
     ]
     child_env = {**os.environ, "PYTHONUTF8": "1", "PYTHONIOENCODING": "utf-8"}
     try:
@@ -2839,33 +3053,66 @@ async def test_signal_pair(request: Request):
             errors="replace", timeout=90, cwd=SCRIPT_DIR, env=child_env,
         )
         stderr = result.stderr.strip()
-        stdout = result.stdout.strip()
+        try:
+            payload = json.loads(result.stdout)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            payload = {}
+        error = str(payload.get("error") or "")
         # Check for Invalid asset error
-        if "Invalid asset" in stderr or "Invalid asset" in stdout:
+        if "Invalid asset" in error or "Invalid asset" in stderr:
             return {"valid": False, "error": f"'{pair_name}' is not a valid PocketOption asset."}
-        if result.returncode != 0 and not stdout:
+        if result.returncode != 0 or "results" not in payload:
             err_lines = [l.strip() for l in stderr.split("\n") if l.strip()]
-            last_err = err_lines[-1] if err_lines else "Unknown error"
+            last_err = error or (err_lines[-1] if err_lines else "Unknown error")
             return {"valid": False, "error": last_err[:300]}
-        # Check if any signal lines exist
-        has_signals = False
-        for line in stdout.split("\n"):
-            parts = line.strip().split()
-            if len(parts) >= 4 and parts[1].startswith("M") and parts[3] in ("CALL", "PUT"):
-                has_signals = True
-                break
-            if "Total signals" in line:
-                has_signals = True
-                break
-        if has_signals:
-            return {"valid": True, "message": f"'{pair_name}' works! Signals found."}
-        else:
-            return {"valid": True, "message": f"'{pair_name}' is accepted by PocketOption but no signals right now (market may be closed)."}
+        return _signal_pair_test_result(pair_name, bool(payload.get("total")))
     except subprocess.TimeoutExpired:
         return {"valid": False, "error": "Test timed out. Try again later."}
     except Exception as e:
         return {"valid": False, "error": str(e)[:300]}
 
+@app.post("/signal-pairs/test")
+async def test_signal_pair(request: Request):
+    """Test if a pair actually works on PocketOption by running the signal engine."""
+    require_login(request)
+    require_csrf(request)
+    data = await request.json()
+    pair_name = (data.get("pair_name") or "").strip().upper()
+    if not pair_name:
+        raise HTTPException(status_code=400, detail="Pair name is required.")
+    asset_name = pair_name.replace("_OTC", "_otc")
+    engine = get_future_signal_engine()
+    if engine is None:
+        return _test_signal_pair_subprocess(pair_name, asset_name)
+    try:
+        result = await asyncio.wait_for(
+            engine.generate(asset_name, timeframe=5, days=1, martingale=0, percentage=70),
+            timeout=90,
+        )
+    except asyncio.TimeoutError:
+        return {"valid": False, "error": "Test timed out. Try again later."}
+    except Exception as e:
+        if "Invalid asset" in str(e):
+            return {"valid": False, "error": f"'{pair_name}' is not a valid PocketOption asset."}
+        return {"valid": False, "error": str(e)[:300]}
+    return _signal_pair_test_result(pair_name, bool(result.signals))
+
+@app.get("/signal-cache/stats")
+def signal_cache_stats(request: Request):
+    """Hit/miss counters of the in-process future signal result cache and _otc fallback."""
+    require_login(request)
+    engine = get_future_signal_engine()
+    if engine is None or engine.cache is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        **engine.cache.stats(),
+        "prewarm": dict(signal_prewarm_last),
+        "feeds": engine.feeds.stats(),
+    }
+
 @app.post("/signal-pairs")
 async def add_signal_pair(request: Request):
     require_login(request)
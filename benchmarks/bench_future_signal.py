@@ -0,0 +1,275 @@
+"""Before/after timings for the future_signal.py hot paths.
+
+Each benchmark runs a copy of the implementation that was replaced next
+to the current code on the same synthetic candles. It checks that both
+give the same result and prints the best time of --repeat runs.
+
+    python benchmarks/bench_future_signal.py slots indicators martingale pool
+"""
+import os
+import sys
+import argparse
+import asyncio
+import copy
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CANDLE_STORE_PATH", "")
+
+import future_signal as fs
+import indicators
+
+END_TS = int(datetime(2024, 3, 6, 9, 0, tzinfo=timezone.utc).timestamp())
+
+
+def synthetic_candles(asset: str, days: int, period: int = 60) -> list[dict]:
+    """`days` of `period`-second candles for asset, newest first like the API."""
+    rng = random.Random(asset)
+    candles = []
+    price = 1.0
+    for i in range(days * 86400 // period, 0, -1):
+        ts = END_TS - i * period
+        o = price
+        c = o + rng.choice((-1, 1, 1, -1, 0)) * 0.0001
+        price = c
+        candles.append({
+            "time": datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "open": o, "close": c, "high": max(o, c) + 0.00005, "low": min(o, c) - 0.00005,
+        })
+    candles.reverse()
+    return candles
+
+
+def best_of(repeat: int, fn, *args):
+    """(best seconds, result of the last run)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def report(label: str, before: float, after: float):
+    print(f"  {label:<12} before {before * 1000:9.1f} ms -> after {after * 1000:8.1f} ms  ({before / after:5.1f}x)")
+
+
+# user-003: per-candle loop + analise_json() vs the NumPy slot kernel
+def _analise_json(vela, analise):
+    horario = vela['hora']
+    if horario not in analise:
+        analise[horario] = {'verde': 0, 'vermelha': 0, 'doji': 0, '%': 0, 'dir': ''}
+    analise[horario][vela['cor']] += 1
+    fs._score_slot(analise[horario])
+    return analise
+
+
+def catalog_slots_loop(velas: list[dict], par: str, timeframe: int) -> dict:
+    """cataloga()'s candle loop before the NumPy kernel."""
+    condicoes = {
+        1: lambda minuto: True,
+        2: lambda minuto: minuto % 2 == 0,
+        5: lambda minuto: minuto % 5 == 0,
+        15: lambda minuto: minuto in {0, 15, 30, 45},
+        30: lambda minuto: minuto in {0, 30},
+        60: lambda minuto: minuto == 0,
+    }
+    data = []
+    for x in reversed(velas):
+        time_local = fs._parse_candle_datetime(x).astimezone(fs.LOCAL_TZ)
+        # The old loop updated the API dicts in place; a copy keeps the input reusable.
+        data.append({
+            **x,
+            'cor': 'verde' if x['open'] < x['close'] else 'vermelha' if x['open'] > x['close'] else 'doji',
+            'data': time_local.strftime('%Y-%m-%d'), 'hora': time_local.strftime('%H:%M'), 'ativo': par,
+        })
+    analise = {}
+    for vela in data:
+        if timeframe in condicoes and condicoes[timeframe](int(vela['hora'].split(':')[1])):
+            analise = _analise_json(vela, analise)
+    return analise
+
+
+def catalog_slots_numpy(velas: list[dict], par: str, timeframe: int) -> dict:
+    ctx = fs.CatalogContext()
+    fs.catalogar_velas(ctx, par, par, fs.candles_to_array(velas), timeframe)
+    return ctx.catalogacao[par]
+
+
+def bench_slots(args):
+    print(f"slots: {args.days} days of candles per timeframe, one asset")
+    for timeframe in (1, 5):
+        velas = synthetic_candles("EURUSD", args.days, timeframe * 60)
+        before, esperado = best_of(args.repeat, catalog_slots_loop, velas, "EURUSD", timeframe)
+        after, obtido = best_of(args.repeat, catalog_slots_numpy, velas, "EURUSD", timeframe)
+        assert obtido == esperado, f"M{timeframe}: catalogs differ"
+        report(f"M{timeframe} ({len(velas)})", before, after)
+
+
+# user-004: scanning every candle per lookback minute vs TechnicalIndex
+def filter_by_scan(lista, data: list[dict], period: int) -> list:
+    """The indicator filters' lookup before TechnicalIndex, fed the same per-candle RSI votes."""
+    nova_lista = []
+    for sinal in lista:
+        hora_inicial = datetime.strptime(sinal.hhmm, '%H:%M')
+        dados = []
+        for i in range(period):
+            hora = (hora_inicial - timedelta(minutes=i)).strftime('%H:%M')
+            dados.extend(item for item in data if item['hora'] == hora and item['ativo'] == sinal.asset)
+        qtd_call = sum(1 for item in dados if item['voto'] == indicators.CALL)
+        qtd_put = sum(1 for item in dados if item['voto'] == indicators.PUT)
+        if qtd_call > qtd_put:
+            if sinal.direction == 'CALL':
+                nova_lista.append(sinal)
+        elif qtd_put > qtd_call:
+            if sinal.direction == 'PUT':
+                nova_lista.append(sinal)
+        else:
+            nova_lista.append(sinal)
+    return nova_lista
+
+
+def bench_indicators(args):
+    ativos = ("EURUSD", "GBPUSD", "AUDCAD", "USDJPY", "EURGBP", "AUDUSD", "NZDUSD", "USDCHF", "EURJPY", "GBPJPY")
+    dias = min(args.days, 3)
+    ctx = fs.CatalogContext()
+    for ativo in ativos:
+        fs.catalogar_velas(ctx, ativo, ativo, fs.candles_to_array(synthetic_candles(ativo, dias)), 1)
+    rng = random.Random(4)
+    lista = [
+        fs.Signal(rng.choice(ativos), 1, fs.HHMM_LABELS[rng.randrange(1440)], rng.choice(('CALL', 'PUT')))
+        for _ in range(100)
+    ]
+    print(f"indicators: RSI filter, {len(ativos)} assets x {dias} days of M1 candles, {len(lista)} signals")
+    for period in (14, 50, 100):
+        # The votes are computed outside the timed scan, which favours the old lookup;
+        # the scan takes seconds, so it runs once.
+        data = []
+        for ativo, velas in ctx.technical_data.items():
+            frame = fs.pd.DataFrame({'close': velas['close']})
+            votos = indicators.rsi_trend(frame['close'], period)
+            data.extend({'hora': fs.HHMM_LABELS[m], 'ativo': ativo, 'voto': v}
+                        for m, v in zip(velas['minuto'].tolist(), votos.tolist()))
+        before, esperado = best_of(1, filter_by_scan, lista, data, period)
+        after, obtido = best_of(args.repeat, lambda: fs.indicadores_rsi(lista, ctx.technical_data, period))
+        assert obtido == esperado, f"RSI({period}): filtered signals differ"
+        report(f"period {period}", before, after)
+
+
+# user-008: datetime round trips per slot and level vs minute-of-day arrays
+def upd_catalo_datetime(catalogacao: dict, martingale: int, timeframe: int):
+    """upd_catalo() before the minute-of-day arrays."""
+    for par in catalogacao:
+        for horario in sorted(catalogacao[par]):
+            mg_time = horario
+            soma = {cor: catalogacao[par][horario][cor] for cor in fs.COR_NOMES}
+            for i in range(int(martingale)):
+                chave = 'mg' + str(i + 1)
+                catalogacao[par][horario].update({chave: {'verde': 0, 'vermelha': 0, 'doji': 0, '%': 0}})
+                now_local = datetime.now(tz=fs.LOCAL_TZ)
+                mg_time = str(datetime.strptime(now_local.strftime('%Y-%m-%d ') + str(mg_time), '%Y-%m-%d %H:%M')
+                              + timedelta(minutes=timeframe))[11:-3]
+                nivel = catalogacao[par][horario][chave]
+                if mg_time in catalogacao[par]:
+                    for cor in fs.COR_NOMES:
+                        nivel[cor] += catalogacao[par][mg_time][cor] + soma[cor]
+                    total_dir = nivel['verde'] + nivel['vermelha']
+                    base_dir = catalogacao[par][horario].get('dir')
+                    if total_dir <= 0 or base_dir not in {'CALL', 'PUT'}:
+                        nivel['%'] = 'N/A'
+                    else:
+                        doji_penalty = total_dir / (total_dir + nivel['doji']) if (total_dir + nivel['doji']) > 0 else 1.0
+                        p = ((nivel['verde'] if base_dir == 'CALL' else nivel['vermelha']) + 1) / (total_dir + 2)
+                        nivel['%'] = round(100 * p * doji_penalty)
+                    for cor in fs.COR_NOMES:
+                        soma[cor] += catalogacao[par][mg_time][cor]
+                else:
+                    nivel['%'] = 'N/A'
+
+
+def upd_catalo_arrays(catalogacao: dict, martingale: int, timeframe: int):
+    fs.upd_catalo(fs.CatalogContext(catalogacao=catalogacao), martingale, timeframe)
+
+
+def bench_martingale(args):
+    ativos = [f"ASSET{i:02d}" for i in range(20)]
+    dias = min(args.days, 5)
+    print(f"martingale: upd_catalo() at martingale=3, {len(ativos)} assets x {dias} days")
+    for timeframe in (1, 5, 15):
+        catalogos = {
+            ativo: catalog_slots_numpy(synthetic_candles(ativo, dias, timeframe * 60), ativo, timeframe)
+            for ativo in ativos
+        }
+        antes, depois = copy.deepcopy(catalogos), copy.deepcopy(catalogos)
+        before, _ = best_of(args.repeat, upd_catalo_datetime, antes, 3, timeframe)
+        after, _ = best_of(args.repeat, upd_catalo_arrays, depois, 3, timeframe)
+        assert depois == antes, f"M{timeframe}: martingale levels differ"
+        report(f"M{timeframe}", before, after)
+
+
+# user-015: analisar_ativo() in-process vs on a warm CatalogPool
+async def _analisar_todos(pool, arrays: dict, filtros) -> fs.CatalogContext:
+    ctx = fs.CatalogContext()
+    jobs = [(ativo, ativo, velas, 1, 3, 0.0, filtros) for ativo, velas in arrays.items()]
+    if pool is None:
+        partes = [fs.analisar_ativo(*job) for job in jobs]
+    else:
+        partes = await asyncio.gather(*(pool.run(fs.analisar_ativo, *job) for job in jobs))
+    for parte in partes:
+        ctx.merge(parte)
+    return ctx
+
+
+def _mesmo_resultado(a: fs.CatalogContext, b: fs.CatalogContext) -> bool:
+    return a.catalogacao == b.catalogacao and a.votos.keys() == b.votos.keys() and all(
+        all(fs.np.array_equal(x, y) for x, y in zip(a.votos[k], b.votos[k])) for k in a.votos
+    )
+
+
+def bench_pool(args):
+    ativos = ("EURUSD", "GBPUSD", "AUDCAD", "USDJPY", "EURGBP", "AUDUSD", "NZDUSD", "USDCHF")
+    arrays = {ativo: fs.candles_to_array(synthetic_candles(ativo, args.days)) for ativo in ativos}
+    filtros = fs.IndicatorConfig(rsi=14, adx=14, cci=20, macd=1)
+    workers = sorted({1, os.cpu_count() or 1} | set(args.workers or ()))
+    print(f"pool: {len(ativos)} assets x {len(next(iter(arrays.values())))} M1 candles, all four filters, "
+          f"{os.cpu_count()} CPU(s)")
+    before, esperado = best_of(args.repeat, lambda: asyncio.run(_analisar_todos(None, arrays, filtros)))
+    for n in workers:
+        pool = fs.CatalogPool(n)
+        try:
+            pool.warm()
+            asyncio.run(_analisar_todos(pool, arrays, filtros))  # first jobs import and start the workers
+            after, obtido = best_of(args.repeat, lambda: asyncio.run(_analisar_todos(pool, arrays, filtros)))
+        finally:
+            pool.shutdown()
+        assert _mesmo_resultado(obtido, esperado), f"{n} worker(s): results differ"
+        report(f"{n} worker(s)", before, after)
+
+
+BENCHMARKS = {
+    "slots": bench_slots,
+    "indicators": bench_indicators,
+    "martingale": bench_martingale,
+    "pool": bench_pool,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", help=f"any of {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--days", type=int, default=50, help="days of synthetic candles")
+    parser.add_argument("--workers", type=int, nargs="+", help="extra CatalogPool sizes for the pool benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per implementation; the best one is shown")
+    args = parser.parse_args()
+    unknown = sorted(set(args.benchmarks) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[name](args)
+
+
+if __name__ == "__main__":
+    main()
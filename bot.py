@@ -3,10 +3,11 @@
     filters
 )
 from telegram import BotCommand, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.error import RetryAfter
+from telegram.error import BadRequest, RetryAfter
 from datetime import datetime
 import asyncio
 import ast
+import hashlib
 import io
 import html as html_mod
 import json
@@ -18,7 +19,8 @@ import sqlite3
 import subprocess
 import sys
 import textwrap
-import requests
+import time
+import httpx
 from dotenv import load_dotenv
 from PIL import Image, ImageDraw, ImageFont
 
@@ -34,10 +36,25 @@ try:
     IMAGEAI_TIMEOUT = float(os.getenv("IMAGEAI_TIMEOUT", "35"))
 except ValueError:
     IMAGEAI_TIMEOUT = 35.0
+# Per-endpoint backend timeouts (seconds); IMAGEAI_TIMEOUT covers /gajaai/price.
+try:
+    BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", "5"))
+except ValueError:
+    BACKEND_TIMEOUT = 5.0
+try:
+    BACKEND_SIGNAL_TIMEOUT = float(os.getenv("BACKEND_SIGNAL_TIMEOUT", "15"))
+except ValueError:
+    BACKEND_SIGNAL_TIMEOUT = 15.0
+try:
+    BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", "100"))
+except ValueError:
+    BACKEND_MAX_CONNECTIONS = 100
 YOOAI_LOADING_GIF_URL = os.getenv(
     "YOOAI_LOADING_GIF_URL",
     "https://i.imgur.com/PLbsXGU.gif",
 ).strip()
+# Reuse Telegram file_ids for local start/menu media instead of re-uploading the file on every send.
+MEDIA_FILE_ID_CACHE = (os.getenv("MEDIA_FILE_ID_CACHE", "1") or "1").strip().lower() not in ("0", "false", "no")
 USE_DARK_LOADING_GIF = (os.getenv("USE_DARK_LOADING_GIF", "1") or "1").strip().lower() not in ("0", "false", "no")
 try:
     YOOAI_LOADING_GIF_SECONDS = float(os.getenv("YOOAI_LOADING_GIF_SECONDS", "1"))
@@ -56,15 +73,36 @@ def is_admin(uid): return uid in ADMIN_IDS
 
 # ================= LOG =================
 logging.basicConfig(level=logging.INFO)
+# One INFO line per backend call is noise; keep httpx warnings only.
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
 # ================= PERF =================
-async def _run_blocking(func, *args, **kwargs):
-    try:
-        to_thread = asyncio.to_thread
-    except AttributeError:
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
-    return await to_thread(func, *args, **kwargs)
+# ================= BACKEND HTTP =================
+_backend_client: httpx.AsyncClient | None = None
+
+def backend_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for every bot -> backend call.
+
+    Handlers await it instead of blocking the event loop, so one slow
+    backend response no longer stalls other users' updates.
+    """
+    global _backend_client
+    if _backend_client is None or _backend_client.is_closed:
+        _backend_client = httpx.AsyncClient(
+            timeout=BACKEND_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=BACKEND_MAX_CONNECTIONS,
+                max_keepalive_connections=max(1, BACKEND_MAX_CONNECTIONS // 4),
+                keepalive_expiry=30.0,
+            ),
+        )
+    return _backend_client
+
+async def close_backend_client(app=None):
+    global _backend_client
+    if _backend_client is not None:
+        await _backend_client.aclose()
+        _backend_client = None
 
 # ================= MEMORY =================
 custom_commands = {}
@@ -224,6 +262,19 @@ def init_usage_db():
             ON feature_user_limits (telegram_id, feature)
             """
         )
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS media_file_ids (
+                bot_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                file_id TEXT NOT NULL,
+                path TEXT NOT NULL,
+                updated_at INTEGER NOT NULL,
+                PRIMARY KEY (bot_id, kind, sha256)
+            )
+            """
+        )
         conn.commit()
 
 
@@ -265,9 +316,12 @@ def _build_usage_after_consume_message(feature: str, remaining: int, reset_ts: i
     )
 
 
-def _build_premium_locked_message(feature: str) -> str:
+async def _build_premium_locked_message(feature: str) -> str:
     if feature == FEATURE_FUTURESIGNAL:
-        return fetch_future_signal_lock_message()
+        bundle = await fetch_start_settings()
+        if bundle and bundle[1].get("future_signal_lock_message"):
+            return bundle[1]["future_signal_lock_message"]
+        return await fetch_future_signal_lock_message()
     return (
         f"{_feature_label(feature)} is a premium feature.\n"
         "Please contact admin to unlock access."
@@ -476,7 +530,118 @@ def has_pending_feature(telegram_id: int, feature: str, ttl_seconds: int) -> boo
             return False
         return True
 
+# ================= BACKEND HEALTH =================
+# Circuit breaker per backend URL: after BACKEND_BREAKER_FAILURES consecutive
+# failures the URL is skipped for BACKEND_BREAKER_SECONDS. A background probe
+# checks /health every BACKEND_PROBE_SECONDS (0 disables probing). Requests
+# always go to the first usable URL in _backend_candidates() order, so the bot
+# returns to BACKEND_URL as soon as its circuit closes. A backend serving the
+# other BOT_MODE (currency on :8000, trading on :8002) is never used.
+try:
+    BACKEND_BREAKER_FAILURES = int(os.getenv("BACKEND_BREAKER_FAILURES", "2"))
+except ValueError:
+    BACKEND_BREAKER_FAILURES = 2
+try:
+    BACKEND_BREAKER_SECONDS = float(os.getenv("BACKEND_BREAKER_SECONDS", "30"))
+except ValueError:
+    BACKEND_BREAKER_SECONDS = 30.0
+try:
+    BACKEND_PROBE_SECONDS = float(os.getenv("BACKEND_PROBE_SECONDS", "15"))
+except ValueError:
+    BACKEND_PROBE_SECONDS = 15.0
+try:
+    BACKEND_PROBE_TIMEOUT = float(os.getenv("BACKEND_PROBE_TIMEOUT", "2"))
+except ValueError:
+    BACKEND_PROBE_TIMEOUT = 2.0
+
+_backend_health: dict[str, dict] = {}  # url -> {"failures": int, "open_until": monotonic}
+_backend_wrong_mode: set[str] = set()  # urls whose start-bundle reports another BOT_MODE
+_backend_probe_task: asyncio.Task | None = None
+
+def backend_circuit_open(url: str) -> bool:
+    state = _backend_health.get(url)
+    return bool(state) and state["open_until"] > time.monotonic()
+
+def mark_backend_ok(url: str):
+    _backend_health[url] = {"failures": 0, "open_until": 0.0}
+
+def mark_backend_failed(url: str):
+    state = _backend_health.setdefault(url, {"failures": 0, "open_until": 0.0})
+    state["failures"] += 1
+    if state["failures"] >= BACKEND_BREAKER_FAILURES:
+        state["open_until"] = time.monotonic() + BACKEND_BREAKER_SECONDS
+
+def check_backend_mode(url: str, bundle: dict) -> bool:
+    """Remember whether url serves this bot's mode; False for the other bot's backend."""
+    mode = str((bundle or {}).get("mode") or BOT_MODE).strip().lower()
+    if mode != BOT_MODE:
+        if url not in _backend_wrong_mode:
+            logging.warning(f"Ignoring backend {url}: it serves mode {mode!r}, this bot is {BOT_MODE!r}")
+        _backend_wrong_mode.add(url)
+        return False
+    _backend_wrong_mode.discard(url)
+    return True
+
+async def backend_get(base_url: str, path: str, **kwargs) -> httpx.Response:
+    """GET base_url + path and record the outcome for the circuit breaker."""
+    try:
+        res = await backend_client().get(f"{base_url}{path}", **kwargs)
+    except Exception:
+        mark_backend_failed(base_url)
+        raise
+    if res.status_code >= 500:
+        mark_backend_failed(base_url)
+    else:
+        mark_backend_ok(base_url)
+    return res
+
+async def probe_backends():
+    async def _probe(url):
+        try:
+            res = await backend_client().get(f"{url}/health", timeout=BACKEND_PROBE_TIMEOUT)
+            if res.status_code == 200:
+                mark_backend_ok(url)
+                res = await backend_client().get(
+                    f"{url}/settings/start-bundle", timeout=BACKEND_PROBE_TIMEOUT
+                )
+                if res.status_code == 200:
+                    check_backend_mode(url, res.json())
+                return
+        except Exception:
+            pass
+        mark_backend_failed(url)
+
+    await asyncio.gather(*(_probe(url) for url in _backend_candidates()))
+
+async def _backend_probe_worker():
+    while True:
+        await probe_backends()
+        await asyncio.sleep(BACKEND_PROBE_SECONDS)
+
+async def start_backend_probe(app):
+    global _backend_probe_task
+    if BACKEND_PROBE_SECONDS > 0 and (_backend_probe_task is None or _backend_probe_task.done()):
+        _backend_probe_task = asyncio.create_task(_backend_probe_worker())
+
+async def stop_backend_probe(app):
+    global _backend_probe_task
+    if _backend_probe_task:
+        _backend_probe_task.cancel()
+        try:
+            await _backend_probe_task
+        except asyncio.CancelledError:
+            pass
+        _backend_probe_task = None
+
 def iter_backend_urls() -> list[str]:
+    """Return backend base URLs to try in _backend_candidates() priority order,
+    skipping URLs whose circuit is open or that serve another BOT_MODE."""
+    return [
+        url for url in _backend_candidates()
+        if url not in _backend_wrong_mode and not backend_circuit_open(url)
+    ]
+
+def _backend_candidates() -> list[str]:
     """Return candidate backend base URLs in priority order (deduplicated)."""
     candidates = [
         (BACKEND_URL or "").strip(),
@@ -498,11 +663,11 @@ def iter_backend_urls() -> list[str]:
         ordered.append(cleaned)
     return ordered
 
-def fetch_signal_pairs():
+async def fetch_signal_pairs():
     """Fetch signal pairs from backend. Returns (choices_dict, display_dict, valid_set) or fallback defaults."""
     for base_url in iter_backend_urls():
         try:
-            res = requests.get(f"{base_url}/signal-pairs", timeout=5)
+            res = await backend_get(base_url, "/signal-pairs", timeout=BACKEND_TIMEOUT)
             if res.status_code != 200:
                 logging.warning(f"/signal-pairs returned {res.status_code} from {base_url}")
                 continue
@@ -585,9 +750,9 @@ DEFAULT_FUTURE_SIGNAL_LOCK_MESSAGE = (
     "Admin can set your access from the admin panel."
 )
 
-def fetch_start_message():
+async def fetch_start_message():
     try:
-        res = requests.get(f"{BACKEND_URL}/settings/start-message", timeout=5)
+        res = await backend_client().get(f"{BACKEND_URL}/settings/start-message", timeout=BACKEND_TIMEOUT)
         if res.status_code == 200:
             msg = res.json().get("message")
             if msg:
@@ -596,9 +761,9 @@ def fetch_start_message():
         pass
     return DEFAULT_START_MESSAGE
 
-def fetch_future_signal_lock_message():
+async def fetch_future_signal_lock_message():
     try:
-        res = requests.get(f"{BACKEND_URL}/settings/future-signal-lock-message", timeout=5)
+        res = await backend_client().get(f"{BACKEND_URL}/settings/future-signal-lock-message", timeout=BACKEND_TIMEOUT)
         if res.status_code == 200:
             msg = res.json().get("message")
             if msg:
@@ -640,11 +805,11 @@ def resolve_backend_media_ref(base_url: str, payload: dict) -> str:
 def resolve_backend_image_ref(base_url: str, payload: dict) -> str:
     return resolve_backend_media_ref(base_url, payload)
 
-def fetch_promo_image_url():
+async def fetch_promo_image_url():
     """Fetch promo image URL from backend settings."""
     for base_url in iter_backend_urls():
         try:
-            res = requests.get(f"{base_url}/settings/promo-image", timeout=5)
+            res = await backend_get(base_url, "/settings/promo-image", timeout=BACKEND_TIMEOUT)
             if res.status_code == 200:
                 data = res.json()
                 image_ref = resolve_backend_media_ref(base_url, data)
@@ -654,11 +819,11 @@ def fetch_promo_image_url():
             continue
     return ""
 
-def fetch_welcome_image_url():
+async def fetch_welcome_image_url():
     """Fetch welcome image URL from backend settings."""
     for base_url in iter_backend_urls():
         try:
-            res = requests.get(f"{base_url}/settings/welcome-image", timeout=5)
+            res = await backend_get(base_url, "/settings/welcome-image", timeout=BACKEND_TIMEOUT)
             if res.status_code == 200:
                 data = res.json()
                 image_ref = resolve_backend_media_ref(base_url, data)
@@ -668,11 +833,11 @@ def fetch_welcome_image_url():
             continue
     return ""
 
-def fetch_menu_image_url():
+async def fetch_menu_image_url():
     """Fetch menu image URL from backend settings."""
     for base_url in iter_backend_urls():
         try:
-            res = requests.get(f"{base_url}/settings/menu-image", timeout=5)
+            res = await backend_get(base_url, "/settings/menu-image", timeout=BACKEND_TIMEOUT)
             if res.status_code == 200:
                 data = res.json()
                 image_ref = resolve_backend_media_ref(base_url, data)
@@ -682,11 +847,11 @@ def fetch_menu_image_url():
             continue
     return ""
 
-def fetch_promo_video_url():
+async def fetch_promo_video_url():
     """Fetch promo video URL from backend settings."""
     for base_url in iter_backend_urls():
         try:
-            res = requests.get(f"{base_url}/settings/promo-video", timeout=5)
+            res = await backend_get(base_url, "/settings/promo-video", timeout=BACKEND_TIMEOUT)
             if res.status_code == 200:
                 data = res.json()
                 media_ref = resolve_backend_media_ref(base_url, data)
@@ -696,11 +861,11 @@ def fetch_promo_video_url():
             continue
     return ""
 
-def fetch_welcome_video_url():
+async def fetch_welcome_video_url():
     """Fetch welcome video URL from backend settings."""
     for base_url in iter_backend_urls():
         try:
-            res = requests.get(f"{base_url}/settings/welcome-video", timeout=5)
+            res = await backend_get(base_url, "/settings/welcome-video", timeout=BACKEND_TIMEOUT)
             if res.status_code == 200:
                 data = res.json()
                 media_ref = resolve_backend_media_ref(base_url, data)
@@ -710,6 +875,62 @@ def fetch_welcome_video_url():
             continue
     return ""
 
+# Local copy of /settings/start-bundle: used without a request for this many
+# seconds, then revalidated with If-None-Match.
+try:
+    START_SETTINGS_TTL_SECONDS = float(os.getenv("START_SETTINGS_TTL_SECONDS", "30"))
+except ValueError:
+    START_SETTINGS_TTL_SECONDS = 30.0
+
+_start_settings: dict | None = None  # {"base_url", "etag", "data", "checked_at"}
+_start_settings_lock = asyncio.Lock()
+
+async def fetch_start_settings():
+    """Return (base_url, settings) for the start/menu flow, or None.
+
+    None means no backend offers /settings/start-bundle and the caller
+    should use the per-setting endpoints. A stale copy is kept when the
+    backend cannot be reached.
+    """
+    global _start_settings
+    cached = _start_settings
+    if cached and (time.monotonic() - cached["checked_at"]) < START_SETTINGS_TTL_SECONDS:
+        return cached["base_url"], cached["data"]
+
+    async with _start_settings_lock:
+        cached = _start_settings
+        if cached and (time.monotonic() - cached["checked_at"]) < START_SETTINGS_TTL_SECONDS:
+            return cached["base_url"], cached["data"]
+
+        for base_url in iter_backend_urls():
+            headers = {}
+            if cached and cached["base_url"] == base_url:
+                headers["If-None-Match"] = cached["etag"]
+            try:
+                res = await backend_get(
+                    base_url, "/settings/start-bundle", headers=headers, timeout=BACKEND_TIMEOUT
+                )
+            except Exception as e:
+                logging.warning(f"Failed to fetch /settings/start-bundle from {base_url}: {e}")
+                continue
+            if res.status_code == 304 and cached:
+                cached["checked_at"] = time.monotonic()
+                return cached["base_url"], cached["data"]
+            if res.status_code == 200:
+                data = res.json()
+                if not check_backend_mode(base_url, data):
+                    continue
+                _start_settings = {
+                    "base_url": base_url,
+                    "etag": res.headers.get("ETag", ""),
+                    "data": data,
+                    "checked_at": time.monotonic(),
+                }
+                return base_url, _start_settings["data"]
+        if cached:
+            return cached["base_url"], cached["data"]
+        return None
+
 def parse_local_media_ref(media_ref: str):
     raw = (media_ref or "").strip()
     if not raw.lower().startswith("local:"):
@@ -722,6 +943,128 @@ def parse_local_media_ref(media_ref: str):
 def parse_local_image_ref(image_ref: str):
     return parse_local_media_ref(image_ref)
 
+# ================= MEDIA FILE_ID CACHE =================
+# file_ids are only valid for the bot that received them, hence the bot id in the key.
+_MEDIA_BOT_ID = (TOKEN or "").split(":", 1)[0]
+# path -> (size, mtime_ns, sha256) so an unchanged file is not re-hashed on every /start.
+_media_digests: dict[str, tuple[int, int, str]] = {}
+_media_upload_locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def local_media_digest(path: str) -> str:
+    st = os.stat(path)
+    cached = _media_digests.get(path)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return cached[2]
+    sha = await asyncio.to_thread(_hash_file, path)
+    _media_digests[path] = (st.st_size, st.st_mtime_ns, sha)
+    return sha
+
+
+def get_cached_file_id(kind: str, sha: str) -> str:
+    with sqlite3.connect(USAGE_DB_PATH) as conn:
+        row = conn.execute(
+            "SELECT file_id FROM media_file_ids WHERE bot_id = ? AND kind = ? AND sha256 = ?",
+            (_MEDIA_BOT_ID, kind, sha),
+        ).fetchone()
+    return row[0] if row else ""
+
+
+def remember_file_id(kind: str, sha: str, file_id: str, path: str) -> None:
+    with sqlite3.connect(USAGE_DB_PATH) as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            INSERT INTO media_file_ids (bot_id, kind, sha256, file_id, path, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(bot_id, kind, sha256) DO UPDATE SET
+                file_id = excluded.file_id,
+                path = excluded.path,
+                updated_at = excluded.updated_at
+            """,
+            (_MEDIA_BOT_ID, kind, sha, file_id, path, _now_ts()),
+        )
+        # Drop entries for media the admin has since replaced: the file was
+        # overwritten in place or removed by the backend after a new upload.
+        c.execute(
+            "DELETE FROM media_file_ids WHERE bot_id = ? AND path = ? AND sha256 != ?",
+            (_MEDIA_BOT_ID, path, sha),
+        )
+        stale = [
+            (row_kind, row_sha)
+            for row_kind, row_sha, row_path in c.execute(
+                "SELECT kind, sha256, path FROM media_file_ids WHERE bot_id = ?",
+                (_MEDIA_BOT_ID,),
+            ).fetchall()
+            if not os.path.isfile(row_path)
+        ]
+        c.executemany(
+            "DELETE FROM media_file_ids WHERE bot_id = ? AND kind = ? AND sha256 = ?",
+            [(_MEDIA_BOT_ID, row_kind, row_sha) for row_kind, row_sha in stale],
+        )
+        conn.commit()
+
+
+def forget_file_id(kind: str, sha: str) -> None:
+    with sqlite3.connect(USAGE_DB_PATH) as conn:
+        conn.execute(
+            "DELETE FROM media_file_ids WHERE bot_id = ? AND kind = ? AND sha256 = ?",
+            (_MEDIA_BOT_ID, kind, sha),
+        )
+        conn.commit()
+
+
+def _sent_file_id(sent, kind: str) -> str:
+    if kind == "photo":
+        photos = getattr(sent, "photo", None) or []
+        return photos[-1].file_id if photos else ""
+    # Telegram may store a silent mp4 as an animation or document; such a
+    # file_id is rejected by reply_video, so only a real video is cached.
+    return getattr(getattr(sent, "video", None), "file_id", "") or ""
+
+
+async def send_local_media(send, kind: str, local_path: str, caption: str, reply_markup=None) -> None:
+    """Send a local file through `send` (reply_photo/reply_video), uploading it only once per content."""
+    if not MEDIA_FILE_ID_CACHE:
+        with open(local_path, "rb") as media_file:
+            await send(media_file, caption=caption, reply_markup=reply_markup)
+        return
+    sha = await local_media_digest(local_path)
+    file_id = get_cached_file_id(kind, sha)
+    if not file_id:
+        # Concurrent /start calls wait for the first upload instead of all uploading the same file
+        lock = _media_upload_locks.setdefault((kind, sha), asyncio.Lock())
+        async with lock:
+            file_id = get_cached_file_id(kind, sha)
+            if not file_id:
+                try:
+                    with open(local_path, "rb") as media_file:
+                        sent = await send(media_file, caption=caption, reply_markup=reply_markup)
+                finally:
+                    _media_upload_locks.pop((kind, sha), None)
+                file_id = _sent_file_id(sent, kind)
+                if file_id:
+                    remember_file_id(kind, sha, file_id, local_path)
+                return
+    try:
+        await send(file_id, caption=caption, reply_markup=reply_markup)
+    except BadRequest as e:
+        logging.warning(f"Cached {kind} file_id rejected, re-uploading {local_path}: {e}")
+        forget_file_id(kind, sha)
+        with open(local_path, "rb") as media_file:
+            sent = await send(media_file, caption=caption, reply_markup=reply_markup)
+        file_id = _sent_file_id(sent, kind)
+        if file_id:
+            remember_file_id(kind, sha, file_id, local_path)
+
 async def send_image_reply(message, image_ref: str, caption: str, reply_markup=None) -> bool:
     local_path = parse_local_media_ref(image_ref)
     try:
@@ -729,8 +1072,13 @@ async def send_image_reply(message, image_ref: str, caption: str, reply_markup=N
             if not os.path.isfile(local_path):
                 logging.warning(f"Local image file not found: {local_path}")
                 return False
-            with open(local_path, "rb") as photo_file:
-                await message.reply_photo(photo=photo_file, caption=caption, reply_markup=reply_markup)
+            await send_local_media(
+                lambda photo, **kwargs: message.reply_photo(photo=photo, **kwargs),
+                "photo",
+                local_path,
+                caption,
+                reply_markup,
+            )
             return True
         await message.reply_photo(photo=image_ref, caption=caption, reply_markup=reply_markup)
         return True
@@ -745,8 +1093,13 @@ async def send_video_reply(message, video_ref: str, caption: str, reply_markup=N
             if not os.path.isfile(local_path):
                 logging.warning(f"Local video file not found: {local_path}")
                 return False
-            with open(local_path, "rb") as video_file:
-                await message.reply_video(video=video_file, caption=caption, reply_markup=reply_markup)
+            await send_local_media(
+                lambda video, **kwargs: message.reply_video(video=video, **kwargs),
+                "video",
+                local_path,
+                caption,
+                reply_markup,
+            )
             return True
         await message.reply_video(video=video_ref, caption=caption, reply_markup=reply_markup)
         return True
@@ -906,21 +1259,21 @@ async def send_temporary_loading_gif(message, caption: str = "Analyzing image...
     return loading_msg
 
 
-def fetch_currency_pair(pair: str):
+async def fetch_currency_pair(pair: str):
     try:
-        res = requests.get(f"{BACKEND_URL}/currency/pair/{pair}", timeout=5)
+        res = await backend_client().get(f"{BACKEND_URL}/currency/pair/{pair}", timeout=BACKEND_TIMEOUT)
         if res.status_code == 200:
             return res.json()
     except Exception:
         pass
     return None
 
-def fetch_currency_signal(pair: str, timeframe: int):
+async def fetch_currency_signal(pair: str, timeframe: int):
     try:
-        res = requests.post(
+        res = await backend_client().post(
             f"{BACKEND_URL}/currency/signal",
             json={"pair": pair, "timeframe": timeframe},
-            timeout=15
+            timeout=BACKEND_SIGNAL_TIMEOUT
         )
         if res.status_code == 200:
             return res.json()
@@ -958,10 +1311,10 @@ def format_money(value):
     except Exception:
         return str(value)
 
-def fetch_imageai_price(file_bytes, filename):
+async def fetch_imageai_price(file_bytes, filename):
     try:
         files = {"file": (filename, file_bytes)}
-        res = requests.post(f"{BACKEND_URL}/gajaai/price", files=files, timeout=IMAGEAI_TIMEOUT)
+        res = await backend_client().post(f"{BACKEND_URL}/gajaai/price", files=files, timeout=IMAGEAI_TIMEOUT)
         if res.status_code == 200:
             return res.json()
         try:
@@ -1345,12 +1698,116 @@ def build_yooai_report_image(data, source_image_bytes: bytes | None = None):
         return None
 
 
-# ================= FUTURE SIGNAL SUBPROCESS =================
+# ================= FUTURE SIGNAL ENGINE =================
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 FUTURE_SIGNAL_SCRIPT = os.path.join(SCRIPT_DIR, "future_signal.py")
+# Run the cataloger inside this process (warm session) instead of spawning future_signal.py.
+FUTURE_SIGNAL_IN_PROCESS = (os.getenv("FUTURE_SIGNAL_IN_PROCESS", "1") or "1").strip().lower() not in ("0", "false", "no")
+FUTURE_SIGNAL_TIMEOUT = 120
+FUTURE_SIGNAL_DAYS = 10
+FUTURE_SIGNAL_MARTINGALE = 0
+FUTURE_SIGNAL_PERCENTAGE = 70
+
+_future_signal_engine = None
+_future_signal_engine_failed = False
+# In-flight generations keyed by (pair, timeframe, params); concurrent callers share one run.
+_future_signal_inflight: dict = {}
+
+def get_future_signal_engine():
+    """Return the shared in-process signal engine, or None to use the subprocess."""
+    global _future_signal_engine, _future_signal_engine_failed
+    if not FUTURE_SIGNAL_IN_PROCESS or _future_signal_engine_failed:
+        return None
+    if _future_signal_engine is None:
+        try:
+            import future_signal
+        except (ImportError, SystemExit) as e:
+            logging.error(f"In-process signal engine unavailable, using subprocess: {e}")
+            _future_signal_engine_failed = True
+            return None
+        _future_signal_engine = future_signal.get_engine()
+    return _future_signal_engine
+
+def format_future_signal_rows(pair: str, timeframe: int, signal_rows: list) -> str:
+    """Render (emoji, asset, tf, hhmm, direction) rows as the Telegram HTML table."""
+    if MAX_FUTURESIGNAL_DISPLAY > 0 and len(signal_rows) > MAX_FUTURESIGNAL_DISPLAY:
+        selected_indices = sorted(
+            random.sample(range(len(signal_rows)), MAX_FUTURESIGNAL_DISPLAY)
+        )
+        signal_rows = [signal_rows[idx] for idx in selected_indices]
+    safe_pair = html_mod.escape(str(pair))
+    count = len(signal_rows)
+    header = f"\U0001F4C8 <b>Future Signals \u2014 {safe_pair} (M{timeframe})</b>\n\n"
+    pair_col = max(len(asset) for _, asset, _, _, _ in signal_rows)
+    tf_col = max(len(tf) for _, _, tf, _, _ in signal_rows)
+    table_lines = []
+    for emoji, asset, tf, hhmm, direction_up in signal_rows:
+        table_lines.append(
+            f"{emoji} {asset.ljust(pair_col)}  {tf.ljust(tf_col)}  {hhmm}  {direction_up}"
+        )
+    code_block = html_mod.escape("\n".join(table_lines))
+    total_text = f"\n\n\U0001F4CB <b>Total signals: {count}</b>"
+    return header + f"<pre>{code_block}</pre>" + total_text
+
+async def _single_flight(key: tuple, factory):
+    """Run factory() once per key at a time; callers arriving meanwhile await the same result."""
+    task = _future_signal_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _future_signal_inflight[key] = task
+        task.add_done_callback(lambda _t: _future_signal_inflight.pop(key, None))
+    else:
+        logging.info(f"Joining in-flight future signal generation {key}")
+    # shield: a caller that gives up must not cancel the run for everyone else
+    return await asyncio.shield(task)
+
+async def generate_future_signal_message(pair: str, timeframe: int) -> str:
+    """Generate future signals for a pair and return the formatted message.
+
+    Identical requests that arrive while one is running share its result.
+    """
+    key = (
+        pair.upper(), int(timeframe),
+        FUTURE_SIGNAL_DAYS, FUTURE_SIGNAL_MARTINGALE, FUTURE_SIGNAL_PERCENTAGE,
+    )
+    return await _single_flight(key, lambda: _generate_future_signal_message(pair, timeframe))
+
+async def _generate_future_signal_message(pair: str, timeframe: int) -> str:
+    engine = get_future_signal_engine()
+    if engine is None:
+        return await run_future_signal_script(pair, timeframe)
+
+    asset_name = pair.replace("_OTC", "_otc")
+    try:
+        result = await asyncio.wait_for(
+            engine.generate(
+                asset_name,
+                timeframe=timeframe,
+                days=FUTURE_SIGNAL_DAYS,
+                martingale=FUTURE_SIGNAL_MARTINGALE,
+                percentage=FUTURE_SIGNAL_PERCENTAGE,
+            ),
+            timeout=FUTURE_SIGNAL_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        logging.error("future signal engine timed out")
+        return "\u26A0\uFE0F Signal generation timed out. Please try again."
+    except Exception as e:
+        logging.error(f"future signal engine error for {pair} M{timeframe}: {e}")
+        return f"\u26A0\uFE0F Signal generation failed for this pair.\n\nError: {str(e)[:300]}"
+
+    if not result.signals:
+        logging.warning(f"No signals generated for {pair} M{timeframe}.")
+        return ""
+    signal_rows = []
+    for sig in result.signals:
+        direction_up = sig.direction.upper()
+        dir_emoji = "\U0001F7E2" if direction_up == "CALL" else "\U0001F534"
+        signal_rows.append((dir_emoji, sig.asset.upper(), f"M{sig.timeframe}", sig.hhmm, direction_up))
+    return format_future_signal_rows(pair, timeframe, signal_rows)
 
 async def run_future_signal_script(pair: str, timeframe: int) -> str:
-    """Run future_signal.py as a subprocess and return its stdout output."""
+    """Run future_signal.py as a subprocess and format its JSON output."""
     # Normalize pair name for the script
     asset_name = pair.replace("_OTC", "_otc")
 
@@ -1358,9 +1815,10 @@ async def run_future_signal_script(pair: str, timeframe: int) -> str:
         sys.executable, FUTURE_SIGNAL_SCRIPT,
         "--assets", asset_name,
         "--timeframe", str(timeframe),
-        "--percentage", "70",
-        "--days", "10",
-        "--martingale", "0",
+        "--percentage", str(FUTURE_SIGNAL_PERCENTAGE),
+        "--days", str(FUTURE_SIGNAL_DAYS),
+        "--martingale", str(FUTURE_SIGNAL_MARTINGALE),
+        "--format", "json",
     ]
 
     # Force child Python process to use UTF-8 for all I/O
@@ -1388,88 +1846,36 @@ async def run_future_signal_script(pair: str, timeframe: int) -> str:
         output = result.stdout.strip()
         error_output = result.stderr.strip()
 
-        if result.returncode != 0:
+        try:
+            payload = json.loads(output) if output else None
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            payload = None
+
+        if result.returncode != 0 or payload is None or payload.get("error"):
             logging.error(f"future_signal.py error (rc={result.returncode}): {error_output}")
-            if not output:
-                # Show meaningful error to user
-                if error_output:
-                    # Extract last meaningful error line
-                    err_lines = [l.strip() for l in error_output.split("\n") if l.strip()]
-                    last_err = err_lines[-1] if err_lines else error_output[:300]
-                    return f"\u26A0\uFE0F Signal generation failed for this pair.\n\nError: {last_err[:300]}"
-                return "\u26A0\uFE0F Signal generation failed. This pair may not be supported."
-
-        # Build a clean, canonical message from parsed signal rows only.
-        signal_pattern = re.compile(
-            r"([A-Za-z][A-Za-z0-9_]*)\s+M(\d{1,3})\s+([0-2]\d:[0-5]\d)\s+(CALL|PUT)\b",
-            re.IGNORECASE,
-        )
-        total_pattern = re.compile(r"Total\s+signals\s*:\s*(\d+)", re.IGNORECASE)
+            last_err = (payload or {}).get("error")
+            if not last_err and error_output:
+                # Extract last meaningful error line
+                err_lines = [l.strip() for l in error_output.split("\n") if l.strip()]
+                last_err = err_lines[-1] if err_lines else error_output[:300]
+            if last_err:
+                return f"\u26A0\uFE0F Signal generation failed for this pair.\n\nError: {str(last_err)[:300]}"
+            return "\u26A0\uFE0F Signal generation failed. This pair may not be supported."
 
-        # Filter out non-signal lines (keep only parsed signal rows + total)
-        lines = output.split("\n")
         signal_rows = []
-        reported_total = None
-        # Known noise lines to skip
-        skip_phrases = [
-            "list created successfully",
-            "cataloger schedules signals",
-            "schedule at",
-            "Signals will always be available",
-            "hours in the future",
-        ]
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            # Skip known noise/warning lines
-            if any(phrase in line for phrase in skip_phrases):
-                continue
-            # Parse signal row from anywhere in the line; ignore broken prefixes.
-            m_signal = signal_pattern.search(line)
-            if m_signal:
-                asset, tf, hhmm, direction = m_signal.groups()
-                direction_up = direction.upper()
+        for res in payload.get("results") or []:
+            for sig in res.get("signals") or []:
+                direction_up = str(sig.get("direction", "")).upper()
                 dir_emoji = "\U0001F7E2" if direction_up == "CALL" else "\U0001F534"
-                signal_rows.append((dir_emoji, asset.upper(), f"M{tf}", hhmm, direction_up))
-                continue
-
-            m_total = total_pattern.search(line)
-            if m_total:
-                reported_total = int(m_total.group(1))
-                continue
-
-            if "No signals found" in line:
-                return f"\u26A0\uFE0F No signals found for {display_pair_name(pair)}."
-            # All other lines are skipped as noise.
+                signal_rows.append(
+                    (dir_emoji, str(sig.get("asset", "")).upper(), f"M{sig.get('timeframe')}", sig.get("hhmm", ""), direction_up)
+                )
 
         if signal_rows:
-            if MAX_FUTURESIGNAL_DISPLAY > 0 and len(signal_rows) > MAX_FUTURESIGNAL_DISPLAY:
-                selected_indices = sorted(
-                    random.sample(range(len(signal_rows)), MAX_FUTURESIGNAL_DISPLAY)
-                )
-                signal_rows = [signal_rows[idx] for idx in selected_indices]
-            safe_pair = html_mod.escape(str(pair))
-            count = len(signal_rows)
-            header = f"\U0001F4C8 <b>Future Signals \u2014 {safe_pair} (M{timeframe})</b>\n\n"
-            pair_col = max(len(asset) for _, asset, _, _, _ in signal_rows)
-            tf_col = max(len(tf) for _, _, tf, _, _ in signal_rows)
-            table_lines = []
-            for emoji, asset, tf, hhmm, direction_up in signal_rows:
-                table_lines.append(
-                    f"{emoji} {asset.ljust(pair_col)}  {tf.ljust(tf_col)}  {hhmm}  {direction_up}"
-                )
-            code_block = html_mod.escape("\n".join(table_lines))
-            total_text = f"\n\n\U0001F4CB <b>Total signals: {count}</b>"
-            return header + f"<pre>{code_block}</pre>" + total_text
-        else:
-            # No valid signal lines found
-            logging.warning(f"No signal lines parsed for {pair} M{timeframe}. Raw output: {output[:300]}. Stderr: {error_output[:200]}")
-            if error_output:
-                err_lines = [l.strip() for l in error_output.split("\n") if l.strip()]
-                last_err = err_lines[-1] if err_lines else error_output[:300]
-                return f"\u26A0\uFE0F No signals found for {display_pair_name(pair)}.\n\nError: {last_err[:300]}"
-            return ""
+            return format_future_signal_rows(pair, timeframe, signal_rows)
+        return f"\u26A0\uFE0F No signals found for {display_pair_name(pair)}."
 
     except asyncio.TimeoutError:
         logging.error("future_signal.py timed out")
@@ -1553,7 +1959,7 @@ async def send_futuresignal_result(message, pair: str, timeframe: int, display=N
         auto_delete=False,
     )
     try:
-        signal_output = fix_mojibake(await run_future_signal_script(pair, timeframe))
+        signal_output = fix_mojibake(await generate_future_signal_message(pair, timeframe))
     finally:
         if loading_msg:
             try:
@@ -1652,6 +2058,18 @@ async def set_bot_menu(app):
     ]
     await app.bot.set_my_commands(commands)
 
+async def on_startup(app):
+    await set_bot_menu(app)
+    await start_user_flush(app)
+    await start_backend_probe(app)
+
+async def on_shutdown(app):
+    await stop_backend_probe(app)
+    await stop_user_flush(app)
+    await close_backend_client(app)
+    if _future_signal_engine is not None:
+        await _future_signal_engine.close()
+
 # ================= SAWA COMMAND =================
 async def sawa(update, context):
     await store_user(update)
@@ -1709,15 +2127,25 @@ async def start(update, context):
         second_message_text = None
 
     # --- 1st message: Promo image + promo text ---
-    tasks = [
-        _run_blocking(fetch_promo_image_url),
-        _run_blocking(fetch_promo_video_url),
-        _run_blocking(fetch_welcome_image_url),
-        _run_blocking(fetch_welcome_video_url),
-    ]
-    if BOT_MODE != "trading":
-        tasks.append(_run_blocking(fetch_start_message))
-    results = await asyncio.gather(*tasks)
+    bundle = await fetch_start_settings()
+    if bundle:
+        base_url, settings = bundle
+        results = [
+            resolve_backend_media_ref(base_url, settings.get(name) or {})
+            for name in ("promo_image", "promo_video", "welcome_image", "welcome_video")
+        ]
+        if BOT_MODE != "trading":
+            results.append(settings.get("start_message") or DEFAULT_START_MESSAGE)
+    else:
+        tasks = [
+            fetch_promo_image_url(),
+            fetch_promo_video_url(),
+            fetch_welcome_image_url(),
+            fetch_welcome_video_url(),
+        ]
+        if BOT_MODE != "trading":
+            tasks.append(fetch_start_message())
+        results = await asyncio.gather(*tasks)
     promo_image_url = results[0]
     promo_video_url = results[1]
     welcome_image_url = results[2] or promo_image_url
@@ -1768,13 +2196,17 @@ async def menu(update, context):
     """Show main menu with inline buttons."""
     await store_user(update)
     if BOT_MODE != "trading":
-        choices, display, valid = fetch_signal_pairs()
+        choices, display, valid = await fetch_signal_pairs()
         context.user_data["_pair_choices"] = choices
         context.user_data["_pair_display"] = display
         context.user_data["_pair_valid"] = valid
 
     menu_text = "\U0001F4CB Main Menu\nChoose an option below:"
-    menu_image_url = fetch_menu_image_url()
+    bundle = await fetch_start_settings()
+    if bundle:
+        menu_image_url = resolve_backend_media_ref(bundle[0], bundle[1].get("menu_image") or {})
+    else:
+        menu_image_url = await fetch_menu_image_url()
     if menu_image_url:
         sent = await send_image_reply(
             update.message,
@@ -1805,12 +2237,12 @@ async def start_menu_callback(update, context):
     if data == CB_START_FUTURE_SIGNAL:
         remaining, reset_ts, limit = get_feature_remaining(user_id, FEATURE_FUTURESIGNAL)
         if limit <= 0:
-            await query.message.reply_text(_build_premium_locked_message(FEATURE_FUTURESIGNAL))
+            await query.message.reply_text(await _build_premium_locked_message(FEATURE_FUTURESIGNAL))
             return
         if remaining <= 0:
             await query.message.reply_text(_build_limit_block_message(FEATURE_FUTURESIGNAL, reset_ts, limit))
             return
-        choices, display, valid = fetch_signal_pairs()
+        choices, display, valid = await fetch_signal_pairs()
         context.user_data["_pair_choices"] = choices
         context.user_data["_pair_display"] = display
         context.user_data["_pair_valid"] = valid
@@ -1852,14 +2284,14 @@ async def futuresignal_callback(update, context):
         )
         if limit <= 0:
             if query.message:
-                await query.message.reply_text(_build_premium_locked_message(FEATURE_FUTURESIGNAL))
+                await query.message.reply_text(await _build_premium_locked_message(FEATURE_FUTURESIGNAL))
             return
         if remaining <= 0:
             if query.message:
                 await query.message.reply_text(_build_limit_block_message(FEATURE_FUTURESIGNAL, reset_ts, limit))
             return
         raw_pair = data[len(CB_FUTURESIGNAL_PAIR_PREFIX):].strip().upper()
-        choices, display, valid = fetch_signal_pairs()
+        choices, display, valid = await fetch_signal_pairs()
         context.user_data["_pair_choices"] = choices
         context.user_data["_pair_display"] = display
         context.user_data["_pair_valid"] = valid
@@ -1882,7 +2314,7 @@ async def futuresignal_callback(update, context):
         pair_part, sep, tf = payload.rpartition(":")
         pair = pair_part.strip().upper() if sep else ""
         tf = tf.strip()
-        choices, display, valid = fetch_signal_pairs()
+        choices, display, valid = await fetch_signal_pairs()
         context.user_data["_pair_choices"] = choices
         context.user_data["_pair_display"] = display
         context.user_data["_pair_valid"] = valid
@@ -1904,7 +2336,7 @@ async def futuresignal_callback(update, context):
             await query.answer("Daily limit reached", show_alert=True)
             if query.message:
                 if limit <= 0:
-                    await query.message.reply_text(_build_premium_locked_message(FEATURE_FUTURESIGNAL))
+                    await query.message.reply_text(await _build_premium_locked_message(FEATURE_FUTURESIGNAL))
                 else:
                     await query.message.reply_text(_build_limit_block_message(FEATURE_FUTURESIGNAL, reset_ts, limit))
             return
@@ -1991,7 +2423,7 @@ async def imageai(update, context):
 # ================= CURRENCY CONVERTER COMMAND =================
 async def currencycoveter(update, context):
     await store_user(update)
-    choices, display, valid = fetch_signal_pairs()
+    choices, display, valid = await fetch_signal_pairs()
     context.user_data["_pair_choices"] = choices
     context.user_data["_pair_display"] = display
     context.user_data["_pair_valid"] = valid
@@ -2009,12 +2441,12 @@ async def futuresignal(update, context):
     user = update.message.from_user
     remaining, reset_ts, limit = get_feature_remaining(user.id, FEATURE_FUTURESIGNAL)
     if limit <= 0:
-        await update.message.reply_text(_build_premium_locked_message(FEATURE_FUTURESIGNAL))
+        await update.message.reply_text(await _build_premium_locked_message(FEATURE_FUTURESIGNAL))
         return
     if remaining <= 0:
         await update.message.reply_text(_build_limit_block_message(FEATURE_FUTURESIGNAL, reset_ts, limit))
         return
-    choices, display, valid = fetch_signal_pairs()
+    choices, display, valid = await fetch_signal_pairs()
     context.user_data["_pair_choices"] = choices
     context.user_data["_pair_display"] = display
     context.user_data["_pair_valid"] = valid
@@ -2025,17 +2457,86 @@ async def futuresignal(update, context):
     )
 
 # ================= STORE USER =================
+# Last-seen updates are buffered per user and sent to /user/store/bulk every
+# USER_STORE_FLUSH_SECONDS (0 = send each update right away).
+try:
+    USER_STORE_FLUSH_SECONDS = float(os.getenv("USER_STORE_FLUSH_SECONDS", "5"))
+except ValueError:
+    USER_STORE_FLUSH_SECONDS = 5.0
+try:
+    USER_STORE_BATCH_MAX = int(os.getenv("USER_STORE_BATCH_MAX", "500"))
+except ValueError:
+    USER_STORE_BATCH_MAX = 500
+
+_pending_users: dict[int, dict] = {}
+_user_flush_task: asyncio.Task | None = None
+# Set when the buffer is full so the flush worker sends it before its next tick.
+_user_flush_now = asyncio.Event()
+
 async def store_user(update):
     user = update.message.from_user
-    data = {
+    _pending_users[user.id] = {
         "telegram_id": user.id,
         "username": user.username or "Unknown",
         "last_message_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
+    if USER_STORE_FLUSH_SECONDS <= 0:
+        await flush_pending_users()
+    elif len(_pending_users) >= USER_STORE_BATCH_MAX:
+        if _user_flush_task is not None and not _user_flush_task.done():
+            _user_flush_now.set()
+        else:
+            await flush_pending_users()
+
+async def flush_pending_users():
+    """Send buffered users in one bulk upsert; keep them for the next try on failure."""
+    if not _pending_users:
+        return
+    batch = list(_pending_users.values())
+    _pending_users.clear()
+    sent = 0
     try:
-        requests.post(f"{BACKEND_URL}/user/store", json=data, timeout=5)
-    except:
-        pass
+        res = await backend_client().post(
+            f"{BACKEND_URL}/user/store/bulk", json={"users": batch}, timeout=BACKEND_TIMEOUT
+        )
+        if res.status_code == 404:
+            # Backend without the bulk endpoint
+            for data in batch:
+                res = await backend_client().post(f"{BACKEND_URL}/user/store", json=data, timeout=BACKEND_TIMEOUT)
+                res.raise_for_status()
+                sent += 1
+            return
+        res.raise_for_status()
+    except Exception as e:
+        logging.warning(f"Failed to store {len(batch) - sent} users: {e}")
+        for data in batch[sent:]:
+            # Newer updates that arrived meanwhile win
+            _pending_users.setdefault(data["telegram_id"], data)
+
+async def _user_flush_worker():
+    while True:
+        try:
+            await asyncio.wait_for(_user_flush_now.wait(), timeout=USER_STORE_FLUSH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _user_flush_now.clear()
+        await flush_pending_users()
+
+async def start_user_flush(app):
+    global _user_flush_task
+    if USER_STORE_FLUSH_SECONDS > 0 and (_user_flush_task is None or _user_flush_task.done()):
+        _user_flush_task = asyncio.create_task(_user_flush_worker())
+
+async def stop_user_flush(app):
+    global _user_flush_task
+    if _user_flush_task:
+        _user_flush_task.cancel()
+        try:
+            await _user_flush_task
+        except asyncio.CancelledError:
+            pass
+        _user_flush_task = None
+    await flush_pending_users()
 
 # ================= NORMAL MESSAGE =================
 async def normal_message(update, context):
@@ -2128,7 +2629,7 @@ async def normal_message(update, context):
             context.user_data.pop(AWAIT_FUTURESIGNAL_PAIR_KEY, None)
             context.user_data.pop(AWAIT_FUTURESIGNAL_TIMEFRAME_KEY, None)
             context.user_data.pop("futuresignal_pair", None)
-            await update.message.reply_text(_build_premium_locked_message(FEATURE_FUTURESIGNAL))
+            await update.message.reply_text(await _build_premium_locked_message(FEATURE_FUTURESIGNAL))
             return
         if remaining <= 0:
             context.user_data.pop(AWAIT_FUTURESIGNAL_PAIR_KEY, None)
@@ -2162,7 +2663,7 @@ async def normal_message(update, context):
         if limit <= 0:
             context.user_data.pop(AWAIT_FUTURESIGNAL_TIMEFRAME_KEY, None)
             context.user_data.pop("futuresignal_pair", None)
-            await update.message.reply_text(_build_premium_locked_message(FEATURE_FUTURESIGNAL))
+            await update.message.reply_text(await _build_premium_locked_message(FEATURE_FUTURESIGNAL))
             return
         raw = text
         if raw in VALID_TIMEFRAMES:
@@ -2178,7 +2679,7 @@ async def normal_message(update, context):
             )
             if not allowed:
                 if limit <= 0:
-                    await update.message.reply_text(_build_premium_locked_message(FEATURE_FUTURESIGNAL))
+                    await update.message.reply_text(await _build_premium_locked_message(FEATURE_FUTURESIGNAL))
                 else:
                     await update.message.reply_text(_build_limit_block_message(FEATURE_FUTURESIGNAL, reset_ts, limit))
                 return
@@ -2215,11 +2716,11 @@ async def normal_message(update, context):
             context.user_data.pop(AWAIT_TIMEFRAME_KEY, None)
             pair = context.user_data.pop("selected_pair", "EURUSD")
             timeframe = int(raw)
-            data = fetch_currency_signal(pair, timeframe)
+            data = await fetch_currency_signal(pair, timeframe)
             if data:
                 await update.message.reply_text(format_signal_result(data))
             else:
-                pair_data = fetch_currency_pair(pair) or CURRENCY_PAIRS.get(pair, {})
+                pair_data = await fetch_currency_pair(pair) or CURRENCY_PAIRS.get(pair, {})
                 price = format_money(pair_data.get("price", ""))
                 link = pair_data.get("link", "")
                 await update.message.reply_text(
@@ -2233,10 +2734,10 @@ async def normal_message(update, context):
         return
 
     try:
-        res = requests.post(
+        res = await backend_client().post(
             f"{BACKEND_URL}/reply/get",
             json={"text": text},
-            timeout=5
+            timeout=BACKEND_TIMEOUT
         )
         if res.status_code == 200:
             reply = res.json().get("reply")
@@ -2318,7 +2819,7 @@ async def user_media_handler(update, context):
                     filename = image_doc.file_name or f"{image_doc.file_unique_id}.jpg"
                 file_bytes = await tg_file.download_as_bytearray()
                 source_image_bytes = bytes(file_bytes)
-                data = fetch_imageai_price(source_image_bytes, filename)
+                data = await fetch_imageai_price(source_image_bytes, filename)
             except Exception:
                 data = None
             finally:
@@ -2511,6 +3012,37 @@ async def viewlimits_command(update, context):
     await update.message.reply_text("\n".join(lines))
 
 
+async def signalcache_command(update, context):
+    """Admin command: /signalcache
+    Show hit/miss counters of the future signal result cache and the _otc fallback.
+    """
+    await store_user(update)
+    if not is_admin(update.message.from_user.id):
+        await update.message.reply_text("Admin only")
+        return
+
+    engine = get_future_signal_engine()
+    if engine is None or engine.cache is None:
+        await update.message.reply_text("Signal cache is disabled.")
+        return
+
+    stats = engine.cache.stats()
+    feeds = engine.feeds.stats()
+    await update.message.reply_text(
+        "Signal cache:\n"
+        f"  • Hits: {stats['hits']}\n"
+        f"  • Misses: {stats['misses']}\n"
+        f"  • Hit rate: {stats['hit_rate'] * 100:.1f}%\n"
+        f"  • Live entries: {stats['entries']}\n"
+        f"  • Persistent: {'yes' if stats['persistent'] else 'no'}\n"
+        "OTC fallback:\n"
+        f"  • Fetches: {feeds['lookups']}\n"
+        f"  • Fallbacks: {feeds['fallbacks']} ({feeds['fallback_rate'] * 100:.1f}%)\n"
+        f"  • Preferred feed hits: {feeds['preferred_hits']}\n"
+        f"  • Second fetches: {feeds['second_fetches']}"
+    )
+
+
 # ================= ADD CUSTOM COMMAND =================
 async def add_command(update, context):
     await store_user(update)
@@ -2534,7 +3066,7 @@ async def command_router(update, context):
 
     cmd = update.message.text.lstrip("/").split()[0].lower()
 
-    if cmd in ["start", "menu", "add", "retarget", "retarget_all", "imageai", "gajaai", "yooai", "currencycoveter", "futuresignal", "botpanel", "setlimit", "clearlimit", "viewlimits"]:
+    if cmd in ["start", "menu", "add", "retarget", "retarget_all", "imageai", "gajaai", "yooai", "currencycoveter", "futuresignal", "botpanel", "setlimit", "clearlimit", "viewlimits", "signalcache"]:
         return
 
     if cmd in custom_commands:
@@ -2543,9 +3075,9 @@ async def command_router(update, context):
         await update.message.reply_text("Unknown command")
 
 # ================= FETCH USERS =================
-def get_users():
+async def get_users():
     try:
-        r = requests.get(f"{BACKEND_URL}/retarget/users", timeout=5)
+        r = await backend_client().get(f"{BACKEND_URL}/retarget/users", timeout=BACKEND_TIMEOUT)
         return r.json().get("users", [])
     except:
         return []
@@ -2585,7 +3117,7 @@ async def admin_media_handler(update, context):
 
     if "retarget_all" in context.user_data:
         context.user_data.pop("retarget_all")
-        users = get_users()
+        users = await get_users()
         await forward_any(update, context, users)
         await update.message.reply_text("[OK] Broadcast done")
 
@@ -2624,7 +3156,8 @@ if not TOKEN:
 init_usage_db()
 app = ApplicationBuilder().token(TOKEN).build()
 
-app.post_init = set_bot_menu
+app.post_init = on_startup
+app.post_shutdown = on_shutdown
 
 app.add_handler(CommandHandler("start", start))
 app.add_handler(CommandHandler("menu", menu))
@@ -2632,6 +3165,7 @@ app.add_handler(CommandHandler("add", add_command))
 app.add_handler(CommandHandler("setlimit", setlimit_command))
 app.add_handler(CommandHandler("clearlimit", clearlimit_command))
 app.add_handler(CommandHandler("viewlimits", viewlimits_command))
+app.add_handler(CommandHandler("signalcache", signalcache_command))
 app.add_handler(CommandHandler("sawa", sawa))
 app.add_handler(CommandHandler("id", aidi))
 app.add_handler(CommandHandler("retarget", retarget_user))
@@ -3,15 +3,25 @@ import os
 import sys
 import argparse
 import asyncio
+import contextlib
+import json
+import sqlite3
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
 try:
+    import numpy as np
     import pandas as pd
     from BinaryOptionsToolsV2.pocketoption import PocketOptionAsync  # type: ignore
 except ImportError:
     os.system("pip install -r requirements.txt")
     try:
+        import numpy as np
         import pandas as pd
         from BinaryOptionsToolsV2.pocketoption import PocketOptionAsync  # type: ignore
     except ImportError as exc:
@@ -19,18 +29,27 @@ except ImportError:
             "Missing dependencies after install. Run: pip install -r requirements.txt"
         ) from exc
 
-# Force UTF-8 for stdout/stderr to prevent mojibake on Windows
-try:
-    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
-    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
-except Exception:
-    pass
+import indicators
+
 
+@dataclass
+class CatalogContext:
+    """State of one signal generation, so several can run at the same time."""
+    catalogacao: dict = field(default_factory=dict)  # asset -> {HH:MM: slot stats}
+    lista: list = field(default_factory=list)  # candidate Signal records
+    technical_data: dict = field(default_factory=dict)  # asset -> CANDLE_DTYPE array
+    signal_confidence: dict = field(default_factory=dict)  # (asset, tf, HH:MM, dir) -> best %
+    diagnostics: dict = field(default_factory=dict)  # asset used -> AssetDiagnostics
+    votos: dict = field(default_factory=dict)  # (asset, indicator, period) -> (calls, puts) per slot
 
-catalogacao = {}
-Lista = []
-technical_data = []
-signal_confidence = {}
+    def merge(self, other: "CatalogContext"):
+        """Fold in the state produced for other assets (e.g. by a pool worker)."""
+        self.catalogacao.update(other.catalogacao)
+        self.lista.extend(other.lista)
+        self.technical_data.update(other.technical_data)
+        self.signal_confidence.update(other.signal_confidence)
+        self.diagnostics.update(other.diagnostics)
+        self.votos.update(other.votos)
 
 try:
     LOCAL_TZ = ZoneInfo('Asia/Dhaka')
@@ -39,13 +58,515 @@ except Exception:
 
 DEBUG_CANDLES = os.getenv("DEBUG_CANDLES", "0") == "1"
 
+# Seconds to let a freshly created PocketOption session connect before the first request.
+try:
+    LOGIN_WARMUP_SECONDS = float(os.getenv("LOGIN_WARMUP_SECONDS", "2"))
+except ValueError:
+    LOGIN_WARMUP_SECONDS = 2.0
 
-async def login():
-    global API
 
+def _create_api():
     ssid = (r'42["auth",{"session":"vtftn12e6f5f5008moitsd6skl","isDemo":1,"uid":27658142,"platform":2}]')
 
-    API = PocketOptionAsync(ssid=ssid)
+    return PocketOptionAsync(ssid=ssid)
+
+
+# Error text the PocketOption client uses when the websocket session itself is gone.
+_SESSION_ERROR_MARKERS = ("websocket", "connection", "disconnected", "not connected", "timed out", "timeout", "ssid")
+
+
+def _is_session_error(exc: BaseException) -> bool:
+    """True for transport/session failures, False for bad requests such as an unknown asset."""
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    text = str(exc).lower()
+    return any(marker in text for marker in _SESSION_ERROR_MARKERS)
+
+
+# Client-side rate limit for get_candles(): sustained requests per second and burst size.
+try:
+    CANDLE_FETCH_RATE = float(os.getenv("CANDLE_FETCH_RATE", "1"))
+except ValueError:
+    CANDLE_FETCH_RATE = 1.0
+try:
+    CANDLE_FETCH_BURST = int(os.getenv("CANDLE_FETCH_BURST", "3"))
+except ValueError:
+    CANDLE_FETCH_BURST = 3
+
+
+class TokenBucket:
+    """Async token bucket: `rate` acquisitions per second, bursts up to `capacity`.
+
+    A rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate: float = CANDLE_FETCH_RATE, capacity: int = CANDLE_FETCH_BURST):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RateLimitedAPI:
+    """Wrap a PocketOption session so every get_candles() waits for a token."""
+
+    def __init__(self, api, limiter: TokenBucket):
+        self._api = api
+        self.limiter = limiter
+
+    async def get_candles(self, symbol: str, period: int, offset: int) -> list[dict]:
+        await self.limiter.acquire()
+        return await self._api.get_candles(symbol, period, offset)
+
+    async def get_candles_advanced(self, symbol: str, period: int, offset: int, time_: int) -> list[dict]:
+        await self.limiter.acquire()
+        return await self._api.get_candles_advanced(symbol, period, offset, time_)
+
+    def __getattr__(self, name):
+        return getattr(self._api, name)
+
+
+# Long lookbacks are downloaded in chunks of this many candles (0 = one request).
+# A single-timeframe catalog asks for at most ~90 bars and never splits; the
+# shared 1-minute history of a multi-timeframe run with M30/M60 (up to ~5,400
+# candles) does.
+try:
+    CANDLE_CHUNK_CANDLES = int(os.getenv("CANDLE_CHUNK_CANDLES", "1440"))
+except ValueError:
+    CANDLE_CHUNK_CANDLES = 1440
+try:
+    CANDLE_CHUNK_CONCURRENCY = int(os.getenv("CANDLE_CHUNK_CONCURRENCY", "4"))
+except ValueError:
+    CANDLE_CHUNK_CONCURRENCY = 4
+try:
+    CANDLE_CHUNK_RETRIES = int(os.getenv("CANDLE_CHUNK_RETRIES", "2"))
+except ValueError:
+    CANDLE_CHUNK_RETRIES = 2
+
+
+class ChunkedCandleAPI:
+    """Wrap a PocketOption session so long get_candles() lookbacks are split.
+
+    The newest chunk is a plain get_candles() call; older chunks are anchored
+    with get_candles_advanced(symbol, period, span, end_time) and fetched
+    concurrently. Each chunk is retried on its own, then the pieces are
+    stitched in the order the API returned and deduplicated by timestamp.
+    Sessions without get_candles_advanced() keep the single request.
+    """
+
+    def __init__(
+        self,
+        api,
+        chunk_candles: int = CANDLE_CHUNK_CANDLES,
+        concurrency: int = CANDLE_CHUNK_CONCURRENCY,
+        retries: int = CANDLE_CHUNK_RETRIES,
+    ):
+        self._api = api
+        # RateLimitedAPI always defines get_candles_advanced(); ask the session it wraps.
+        session = api._api if isinstance(api, RateLimitedAPI) else api
+        self.advanced = hasattr(session, "get_candles_advanced")
+        self.chunk_candles = int(chunk_candles)
+        self.retries = max(0, int(retries))
+        self._semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async def _fetch_chunk(self, symbol: str, period: int, span: int, end: int | None) -> list[dict]:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    if end is None:
+                        candles = await self._api.get_candles(symbol, period, span)
+                    else:
+                        candles = await self._api.get_candles_advanced(symbol, period, span, end)
+                return candles or []
+            except Exception:
+                if attempt >= self.retries:
+                    raise
+                attempt += 1
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+
+    async def get_candles(self, symbol: str, period: int, offset: int) -> list[dict]:
+        period = int(period)
+        offset = int(offset)
+        span = period * self.chunk_candles
+        if span <= 0 or offset <= span or not self.advanced:
+            return await self._api.get_candles(symbol, period, offset)
+
+        now = int(time.time())
+        ranges = [(min(span, offset - start), None if start == 0 else now - start)
+                  for start in range(0, offset, span)]
+        pieces = await asyncio.gather(
+            *(self._fetch_chunk(symbol, period, size, end) for size, end in ranges)
+        )
+
+        by_ts = {}
+        for candles in reversed(pieces):  # oldest chunk first, newer ones win at the edges
+            for candle in candles:
+                try:
+                    by_ts[int(_parse_candle_datetime(candle).timestamp())] = candle
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+        newest = pieces[0]
+        newest_first = True
+        if len(newest) >= 2:
+            try:
+                newest_first = _parse_candle_datetime(newest[0]) >= _parse_candle_datetime(newest[-1])
+            except (KeyError, TypeError, ValueError):
+                pass
+        return [by_ts[ts] for ts in sorted(by_ts, reverse=newest_first)]
+
+    def __getattr__(self, name):
+        return getattr(self._api, name)
+
+
+# Local candle history, keyed by (symbol, period). Empty path disables the store.
+CANDLE_STORE_PATH = os.getenv(
+    "CANDLE_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "candles.db"),
+).strip()
+try:
+    CANDLE_STORE_RETENTION_DAYS = int(os.getenv("CANDLE_STORE_RETENTION_DAYS", "60"))
+except ValueError:
+    CANDLE_STORE_RETENTION_DAYS = 60
+
+
+def _parse_candle_datetime(candle: dict) -> datetime:
+    """Return candle datetime in UTC.
+
+    PocketOption candle payloads may contain either:
+    - 'time' as ISO string like '2024-01-01T12:34:56Z'
+    - 'timestamp' as unix seconds (float/int), sometimes ms
+    """
+    if 'time' in candle and candle['time']:
+        time_str = str(candle['time'])
+        try:
+            return datetime.strptime(time_str, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        except ValueError:
+            if time_str.endswith('Z'):
+                time_str = time_str[:-1]
+            # Try ISO8601 without timezone or with offset
+            try:
+                dt = datetime.fromisoformat(time_str)
+                if dt.tzinfo is None:
+                    dt = dt.replace(tzinfo=timezone.utc)
+                return dt
+            except ValueError as exc:
+                raise ValueError(f"Unrecognized candle 'time' format: {candle['time']!r}") from exc
+
+    if 'timestamp' in candle and candle['timestamp'] is not None:
+        ts = float(candle['timestamp'])
+        if ts > 1_000_000_000_000:
+            ts = ts / 1000.0
+        return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+    raise KeyError("Candle has neither 'time' nor 'timestamp'")
+
+
+class CandleStore:
+    """SQLite candle history that only asks the API for candles it does not have.
+
+    `covered_from` records the oldest epoch from which the stored series is
+    complete, so a request for a longer lookback still triggers a full fetch.
+    """
+
+    def __init__(self, path: str = CANDLE_STORE_PATH, retention_days: int = CANDLE_STORE_RETENTION_DAYS):
+        self.path = path
+        self.retention_days = max(1, int(retention_days))
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS candles (
+                    symbol TEXT NOT NULL,
+                    period INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    PRIMARY KEY (symbol, period, ts)
+                )
+            ''')
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS candle_series (
+                    symbol TEXT NOT NULL,
+                    period INTEGER NOT NULL,
+                    covered_from INTEGER NOT NULL,
+                    newest_first INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (symbol, period)
+                )
+            ''')
+            conn.commit()
+
+    def _series_info(self, symbol: str, period: int):
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute(
+                "SELECT covered_from, newest_first FROM candle_series WHERE symbol=? AND period=?",
+                (symbol, period),
+            )
+            info = c.fetchone()
+            c.execute("SELECT MAX(ts) FROM candles WHERE symbol=? AND period=?", (symbol, period))
+            last_ts = c.fetchone()[0]
+        return info, last_ts
+
+    def _save(self, symbol: str, period: int, candles: list[dict], covered_from: int | None):
+        rows = []
+        for candle in candles:
+            try:
+                ts = int(_parse_candle_datetime(candle).timestamp())
+                rows.append((symbol, period, ts, float(candle['open']), float(candle['high']),
+                             float(candle['low']), float(candle['close'])))
+            except (KeyError, TypeError, ValueError):
+                continue
+        newest_first = None
+        if len(rows) >= 2 and rows[0][2] != rows[-1][2]:
+            newest_first = 1 if rows[0][2] > rows[-1][2] else 0
+
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.executemany(
+                "INSERT OR REPLACE INTO candles (symbol, period, ts, open, high, low, close) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if covered_from is not None:
+                c.execute(
+                    "INSERT INTO candle_series (symbol, period, covered_from, newest_first) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(symbol, period) DO UPDATE SET covered_from=excluded.covered_from",
+                    (symbol, period, covered_from, 1 if newest_first is None else newest_first),
+                )
+                c.execute(
+                    "DELETE FROM candles WHERE symbol=? AND period=? AND ts < ?",
+                    (symbol, period, int(time.time()) - self.retention_days * 86400),
+                )
+            if newest_first is not None:
+                c.execute(
+                    "UPDATE candle_series SET newest_first=? WHERE symbol=? AND period=?",
+                    (newest_first, symbol, period),
+                )
+            conn.commit()
+
+    def load(self, symbol: str, period: int, since_ts: int, newest_first: bool = True) -> list[dict]:
+        order = "DESC" if newest_first else "ASC"
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute(
+                "SELECT ts, open, high, low, close FROM candles "
+                f"WHERE symbol=? AND period=? AND ts >= ? ORDER BY ts {order}",
+                (symbol, period, since_ts),
+            )
+            rows = c.fetchall()
+        return [
+            {
+                'time': datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                'open': o,
+                'high': h,
+                'low': l,
+                'close': cl,
+            }
+            for ts, o, h, l, cl in rows
+        ]
+
+    async def get_candles(self, api, symbol: str, period: int, offset: int) -> list[dict]:
+        """Drop-in for api.get_candles() that fetches only the missing tail."""
+        period = int(period)
+        offset = int(offset)
+        now = int(time.time())
+        window_start = now - offset
+        info, last_ts = self._series_info(symbol, period)
+
+        if info is None or last_ts is None or info[0] > window_start or (now - last_ts) >= offset:
+            candles = await api.get_candles(symbol, period, offset)
+            self.full_fetches += 1
+            self._save(symbol, period, candles, covered_from=window_start)
+            return candles
+
+        # Re-read the last stored candle too: it may still have been forming.
+        tail_offset = ((now - last_ts) // period + 2) * period
+        candles = await api.get_candles(symbol, period, tail_offset)
+        self.incremental_fetches += 1
+        self._save(symbol, period, candles, covered_from=None)
+        return self.load(symbol, period, window_start, newest_first=bool(info[1]))
+
+
+# Per-day slot colour counts, keyed by (asset, timeframe, minute, day). Empty path disables.
+SLOT_STATS_PATH = os.getenv("SLOT_STATS_PATH", "").strip()
+try:
+    SLOT_STATS_RETENTION_DAYS = int(os.getenv("SLOT_STATS_RETENTION_DAYS", "60"))
+except ValueError:
+    SLOT_STATS_RETENTION_DAYS = 60
+
+
+# (day, minute) lexicographic range; each bar of a series has its own (day, minute).
+_SLOT_RANGE_SQL = "(day > ? OR (day = ? AND minute >= ?)) AND (day < ? OR (day = ? AND minute <= ?))"
+
+
+def _slot_range_args(first_ts: int, last_ts: int) -> tuple[int, ...]:
+    minutos, dias = _local_minutes(np.array([first_ts, last_ts], dtype=np.int64))
+    d0, d1 = int(dias[0]), int(dias[1])
+    return d0, d0, int(minutos[0]), d1, d1, int(minutos[1])
+
+
+class SlotStatsStore:
+    """SQLite green/red/doji counts per (asset, timeframe, minute of day, day).
+
+    Every catalogued bar is one row, and the store remembers the time range
+    it has seen per series. cataloga() can then download only the bars after
+    that range and answer any window by summing the stored rows between its
+    first and last bar. Holds only its path and settings, so it can be
+    passed to CatalogPool workers.
+    """
+
+    def __init__(self, path: str = SLOT_STATS_PATH, retention_days: int = SLOT_STATS_RETENTION_DAYS):
+        self.path = path
+        self.retention_days = max(1, int(retention_days))
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS slot_stats (
+                    asset TEXT NOT NULL,
+                    timeframe INTEGER NOT NULL,
+                    minute INTEGER NOT NULL,
+                    day INTEGER NOT NULL,
+                    verde INTEGER NOT NULL,
+                    vermelha INTEGER NOT NULL,
+                    doji INTEGER NOT NULL,
+                    PRIMARY KEY (asset, timeframe, minute, day)
+                )
+            ''')
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS slot_stats_coverage (
+                    asset TEXT NOT NULL,
+                    timeframe INTEGER NOT NULL,
+                    first_ts INTEGER NOT NULL,
+                    last_ts INTEGER NOT NULL,
+                    PRIMARY KEY (asset, timeframe)
+                )
+            ''')
+            conn.commit()
+
+    def coverage(self, asset: str, timeframe: int) -> tuple[int, int] | None:
+        """(first_ts, last_ts) of the stored, gap-free range of this series."""
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute(
+                "SELECT first_ts, last_ts FROM slot_stats_coverage WHERE asset=? AND timeframe=?",
+                (asset, int(timeframe)),
+            )
+            row = c.fetchone()
+        return (int(row[0]), int(row[1])) if row else None
+
+    def update(self, asset: str, timeframe: int, velas: np.ndarray, covered_from: int | None = None) -> int:
+        """Store every bar of velas and extend the covered range.
+
+        velas is a chronological CANDLE_DTYPE array with minuto/dia/cor set,
+        downloaded for the range starting at `covered_from` (default: its
+        first bar). Returns the number of bars written.
+        """
+        timeframe = int(timeframe)
+        period = timeframe * 60
+        velas = velas[(velas['minuto'] % timeframe) == 0]
+        if len(velas) == 0:
+            return 0
+        primeiro, ultimo = int(velas['ts'][0]), int(velas['ts'][-1])
+        inicio = primeiro if covered_from is None else min(int(covered_from), primeiro)
+        cores = velas['cor']
+        rows = list(zip(
+            [asset] * len(velas), [timeframe] * len(velas),
+            velas['minuto'].tolist(), velas['dia'].tolist(),
+            (cores == COR_VERDE).astype(int).tolist(),
+            (cores == COR_VERMELHA).astype(int).tolist(),
+            (cores == COR_DOJI).astype(int).tolist(),
+        ))
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute(
+                f"DELETE FROM slot_stats WHERE asset=? AND timeframe=? AND {_SLOT_RANGE_SQL}",
+                (asset, timeframe, *_slot_range_args(primeiro, ultimo)),
+            )
+            c.executemany(
+                "INSERT OR REPLACE INTO slot_stats (asset, timeframe, minute, day, verde, vermelha, doji) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+            c.execute(
+                "SELECT first_ts, last_ts FROM slot_stats_coverage WHERE asset=? AND timeframe=?",
+                (asset, timeframe),
+            )
+            atual = c.fetchone()
+            if atual and inicio <= atual[1] + period and ultimo >= atual[0]:
+                inicio, ultimo = min(inicio, atual[0]), max(ultimo, atual[1])
+            elif atual and ultimo < atual[1]:
+                inicio, ultimo = atual  # older, disjoint download: keep the newer range
+            limite = ultimo - self.retention_days * 86400
+            c.execute(
+                "INSERT OR REPLACE INTO slot_stats_coverage (asset, timeframe, first_ts, last_ts) VALUES (?, ?, ?, ?)",
+                (asset, timeframe, max(inicio, limite), ultimo),
+            )
+            limite_dia = int(_local_minutes(np.array([limite], dtype=np.int64))[1][0])
+            c.execute(
+                "DELETE FROM slot_stats WHERE asset=? AND timeframe=? AND day < ?", (asset, timeframe, limite_dia)
+            )
+            conn.commit()
+        return len(rows)
+
+    def counts(self, asset: str, timeframe: int, first_ts: int, last_ts: int) -> np.ndarray:
+        """(1440, 3) green/red/doji counts per minute of day for the bars first_ts..last_ts."""
+        contagem = np.zeros((1440, 3), dtype=np.int64)
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute(
+                "SELECT minute, SUM(verde), SUM(vermelha), SUM(doji) FROM slot_stats "
+                f"WHERE asset=? AND timeframe=? AND {_SLOT_RANGE_SQL} GROUP BY minute",
+                (asset, int(timeframe), *_slot_range_args(first_ts, last_ts)),
+            )
+            for minuto, v, r, d in c.fetchall():
+                contagem[minuto] = (v, r, d)
+        return contagem
+
+
+class StoredCandleAPI:
+    """Wrap a PocketOption session so get_candles() goes through a CandleStore."""
+
+    def __init__(self, api, store: CandleStore):
+        self._api = api
+        self.store = store
+
+    async def get_candles(self, symbol: str, period: int, offset: int) -> list[dict]:
+        return await self.store.get_candles(self._api, symbol, period, offset)
+
+    def __getattr__(self, name):
+        return getattr(self._api, name)
 
 
 
@@ -76,6 +597,16 @@ def _float_range(min_value: float, max_value: float):
     return _parse
 
 
+def _timeframe_list(value: str) -> tuple[int, ...]:
+    try:
+        timeframes = tuple(sorted({int(v) for v in str(value).split(",") if v.strip()}))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("must be comma-separated integers") from exc
+    if not timeframes or any(tf not in (1, 2, 5, 15, 30, 60) for tf in timeframes):
+        raise argparse.ArgumentTypeError("timeframes must be among 1,2,5,15,30,60")
+    return timeframes
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="PocketOption cataloger (non-interactive)")
     parser.add_argument(
@@ -85,6 +616,13 @@ def parse_args() -> argparse.Namespace:
         default=5,
         help="Timeframe in minutes (1,2,5,15,30,60).",
     )
+    parser.add_argument(
+        "--timeframes",
+        type=_timeframe_list,
+        default=None,
+        help="Comma-separated timeframes, e.g. '1,5,15'. Fetches 1-minute candles once and "
+        "resamples them (overrides --timeframe).",
+    )
     parser.add_argument(
         "--martingale",
         type=_int_range(0, 3),
@@ -132,6 +670,12 @@ def parse_args() -> argparse.Namespace:
         required=True,
         help="Comma-separated assets, e.g. 'AUDCAD,EURUSD,EURUSD_otc'.",
     )
+    parser.add_argument(
+        "--format",
+        choices=["text", "json", "ndjson"],
+        default="text",
+        help="Output format: human-readable text, one JSON document, or one JSON record per line.",
+    )
     return parser.parse_args()
 
 
@@ -156,217 +700,559 @@ def get_config_from_args(args: argparse.Namespace):
 
 
 # Cataloging stats
-async def cataloga(par, timeframe, days, martingale):
-    global technical_data
-    data = []
-
+def _candle_window(timeframe, days, martingale) -> tuple[int, int]:
+    """(period, offset) in seconds of the history requested for one catalog."""
     if martingale == 0:
         martingale = 1
-    
+
     period = (timeframe * 60)
     porta = 4000 + (500*martingale)
     Vela_ = (porta - (110*days))
     time_ = ((Vela_ * timeframe))
-    
-    def _is_flat_candle(candle: dict) -> bool:
-        try:
-            o = float(candle.get('open'))
-            h = float(candle.get('high'))
-            l = float(candle.get('low'))
-            c = float(candle.get('close'))
-        except (TypeError, ValueError):
-            return False
-        return abs(o - c) < 1e-12 and abs(o - h) < 1e-12 and abs(o - l) < 1e-12
-
-    def _flat_ratio(candles: list[dict]) -> float:
-        if not candles:
-            return 1.0
-        flat = sum(1 for v in candles if _is_flat_candle(v))
-        return flat / max(1, len(candles))
-
-    async def _get_candles_with_fallback(symbol: str) -> tuple[str, list[dict]]:
-        candles = await API.get_candles(symbol, period, time_)
-        ratio = _flat_ratio(candles)
-        if ratio < 0.9:
+    return period, time_
+
+
+def _is_flat_candle(candle: dict) -> bool:
+    try:
+        o = float(candle.get('open'))
+        h = float(candle.get('high'))
+        l = float(candle.get('low'))
+        c = float(candle.get('close'))
+    except (TypeError, ValueError):
+        return False
+    return abs(o - c) < 1e-12 and abs(o - h) < 1e-12 and abs(o - l) < 1e-12
+
+
+def _flat_ratio(candles: list[dict]) -> float:
+    if not candles:
+        return 1.0
+    flat = sum(1 for v in candles if _is_flat_candle(v))
+    return flat / max(1, len(candles))
+
+
+# Learned _otc fallback: race both variants when the preference is unknown.
+OTC_FALLBACK_RACE = (os.getenv("OTC_FALLBACK_RACE", "0") or "0").strip().lower() not in ("0", "false", "no")
+try:
+    FEED_PREFERENCE_TTL_HOURS = float(os.getenv("FEED_PREFERENCE_TTL_HOURS", "192"))
+except ValueError:
+    FEED_PREFERENCE_TTL_HOURS = 192.0
+# An hour-of-week entry is next looked up up to a week plus an hour after it was learned.
+FEED_PREFERENCE_MIN_TTL_HOURS = 7 * 24 + 1
+
+
+def _alt_symbol(symbol: str) -> str:
+    return symbol[:-4] if symbol.endswith('_otc') else f"{symbol}_otc"
+
+
+class FeedPreference:
+    """Remembers which variant (symbol or its _otc twin) last had a live feed.
+
+    Entries are keyed by requested symbol and UTC hour of the week, so the
+    weekend/off-hours answer does not leak into market hours, and expire
+    after `ttl_hours`. The TTL is at least a week (plus the hour itself),
+    so what was learned on Monday 14:00 is reused next Monday 14:00.
+    Using an entry does not extend it: a learned _otc is dropped when the
+    TTL runs out and the regular symbol is tried first again.
+    Counters show how often the fallback fires.
+    """
+
+    def __init__(self, ttl_hours: float = FEED_PREFERENCE_TTL_HOURS, race: bool = OTC_FALLBACK_RACE):
+        self.ttl_seconds = max(FEED_PREFERENCE_MIN_TTL_HOURS, float(ttl_hours)) * 3600
+        self.race = bool(race)
+        self._learned: dict[tuple[str, int], tuple[str, float]] = {}
+        self.lookups = 0
+        self.preferred_hits = 0
+        self.fallbacks = 0
+        self.second_fetches = 0
+        self.races = 0
+
+    @staticmethod
+    def _bucket(now: float) -> int:
+        dt = datetime.fromtimestamp(now, tz=timezone.utc)
+        return dt.weekday() * 24 + dt.hour
+
+    def preferred(self, symbol: str, now: float | None = None) -> str | None:
+        now = time.time() if now is None else now
+        learned = self._learned.get((symbol, self._bucket(now)))
+        if learned is None or now - learned[1] > self.ttl_seconds:
+            return None
+        return learned[0]
+
+    def learn(self, symbol: str, used: str, now: float | None = None):
+        now = time.time() if now is None else now
+        key = (symbol, self._bucket(now))
+        learned = self._learned.get(key)
+        if learned is None or learned[0] != used or now - learned[1] > self.ttl_seconds:
+            self._learned[key] = (used, now)
+        if used != symbol:
+            self.fallbacks += 1
+
+    def stats(self) -> dict:
+        return {
+            'lookups': self.lookups,
+            'preferred_hits': self.preferred_hits,
+            'fallbacks': self.fallbacks,
+            'fallback_rate': (self.fallbacks / self.lookups) if self.lookups else 0.0,
+            'second_fetches': self.second_fetches,
+            'races': self.races,
+            'learned': len(self._learned),
+        }
+
+
+def _pick_feed(symbol: str, candles: list[dict], alt: str, alt_candles: list[dict]) -> tuple[str, list[dict]]:
+    ratio = _flat_ratio(candles)
+    if ratio >= 0.9 and _flat_ratio(alt_candles) < ratio:
+        print(
+            f"[{datetime.now().strftime('%H:%M:%S')}] - Note: candle feed for {symbol} looks flat; using {alt} instead."
+        )
+        return alt, alt_candles
+    return symbol, candles
+
+
+async def _get_candles_with_fallback(api, symbol: str, period: int, offset: int,
+                                     feeds: FeedPreference | None = None) -> tuple[str, list[dict]]:
+    """Candles for `symbol`, or for its _otc twin when the feed looks flat.
+
+    With a FeedPreference the variant that last had a live feed is fetched
+    first and the other one only if it turns out flat; unknown symbols can
+    race both variants instead of fetching them one after the other.
+    """
+    alt = _alt_symbol(symbol)
+    if feeds is None:
+        candles = await api.get_candles(symbol, period, offset)
+        if _flat_ratio(candles) < 0.9:
             return symbol, candles
+        return _pick_feed(symbol, candles, alt, await api.get_candles(alt, period, offset))
+
+    feeds.lookups += 1
+    preferred = feeds.preferred(symbol)
+    if preferred is None and feeds.race:
+        feeds.races += 1
+        candles, alt_candles = await asyncio.gather(
+            api.get_candles(symbol, period, offset), api.get_candles(alt, period, offset)
+        )
+        used, velas = _pick_feed(symbol, candles, alt, alt_candles)
+    else:
+        first = preferred or symbol
+        other = alt if first == symbol else symbol
+        velas = await api.get_candles(first, period, offset)
+        if _flat_ratio(velas) < 0.9:
+            if preferred is not None:
+                feeds.preferred_hits += 1
+            used = first
+        else:
+            feeds.second_fetches += 1
+            other_velas = await api.get_candles(other, period, offset)
+            if first == symbol:
+                used, velas = _pick_feed(symbol, velas, other, other_velas)
+            else:
+                used, velas = _pick_feed(symbol, other_velas, alt, velas)
+    feeds.learn(symbol, used)
+    return used, velas
+
+
+async def cataloga(ctx: CatalogContext, api, par, timeframe, days, martingale, indicators=None, pool=None,
+                   feeds=None, slot_stats=None):
+    period, time_ = _candle_window(timeframe, days, martingale)
+
+    # Indicator filters need the whole candle series, so only plain catalogs come from the store.
+    usa_indicadores = indicators is not None and any(asdict(indicators).values())
+    if slot_stats is not None and not usa_indicadores and timeframe in TIMEFRAMES:
+        par_used = await _cataloga_do_store(ctx, api, par, timeframe, period, time_, martingale, pool, feeds, slot_stats)
+        if par_used is not None:
+            return par_used
+
+    agora = int(time.time())
+    started = time.monotonic()
+    par_used, velas = await _get_candles_with_fallback(api, par, period, time_, feeds)
+    fetch_seconds = time.monotonic() - started
+    args = (par, par_used, candles_to_array(velas), timeframe, martingale, fetch_seconds, indicators, slot_stats,
+            agora - time_)
+    ctx.merge(await pool.run(analisar_ativo, *args) if pool else analisar_ativo(*args))
+    return par_used
 
-        alt = symbol[:-4] if symbol.endswith('_otc') else f"{symbol}_otc"
-        alt_candles = await API.get_candles(alt, period, time_)
-        if _flat_ratio(alt_candles) < ratio:
-            print(
-                f"[{datetime.now().strftime('%H:%M:%S')}] - Note: candle feed for {symbol} looks flat; using {alt} instead."
-            )
-            return alt, alt_candles
-        return symbol, candles
 
-    par_used, velas = await _get_candles_with_fallback(par)
-    velas.reverse()
+async def _cataloga_do_store(ctx: CatalogContext, api, par, timeframe, period, time_, martingale, pool, feeds,
+                             slot_stats: SlotStatsStore) -> str | None:
+    """cataloga() from a SlotStatsStore: no download if the store already has the
+    newest closed bar, otherwise only the bars after its stored range.
 
-    
-    def _parse_candle_datetime(candle: dict) -> datetime:
-        """Return candle datetime in UTC.
+    The stored variant is the one stored most recently. New bars go through
+    the same _otc fallback and FeedPreference as a full download; if the
+    live feed is now the other variant, the caller downloads the whole
+    window for it. Returns the symbol used, or None when the store cannot
+    answer (the caller then downloads the whole window).
+    """
+    agora = int(time.time())
+    cobertos = {s: slot_stats.coverage(s, timeframe) for s in (par, _alt_symbol(par))}
+    cobertos = {s: c for s, c in cobertos.items() if c and c[0] <= agora - time_ + period}
+    if not cobertos:
+        return None
+    par_used, (_primeiro, ultimo) = max(cobertos.items(), key=lambda kv: kv[1][1])
+
+    velas = []
+    fetch_seconds = 0.0
+    covered_from = None
+    if ultimo < agora // period * period - period:
+        # Re-download from the last stored bar on, which may still have been forming.
+        cauda = -(-(agora - ultimo + period) // period) * period
+        if cauda >= time_:
+            return None
+        started = time.monotonic()
+        par_cauda, velas = await _get_candles_with_fallback(api, par, period, cauda, feeds)
+        fetch_seconds = time.monotonic() - started
+        if par_cauda != par_used:
+            return None
+        covered_from = agora - cauda
+    args = (par, par_used, candles_to_array(velas), timeframe, martingale, fetch_seconds, slot_stats,
+            covered_from, time_ // period)
+    parcial = await pool.run(analisar_do_store, *args) if pool else analisar_do_store(*args)
+    if parcial is None:
+        return None
+    ctx.merge(parcial)
+    return par_used
 
-        PocketOption candle payloads may contain either:
-        - 'time' as ISO string like '2024-01-01T12:34:56Z'
-        - 'timestamp' as unix seconds (float/int), sometimes ms
-        """
-        if 'time' in candle and candle['time']:
-            time_str = str(candle['time'])
-            try:
-                return datetime.strptime(time_str, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-            except ValueError:
-                if time_str.endswith('Z'):
-                    time_str = time_str[:-1]
-                # Try ISO8601 without timezone or with offset
-                try:
-                    dt = datetime.fromisoformat(time_str)
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    return dt
-                except ValueError as exc:
-                    raise ValueError(f"Unrecognized candle 'time' format: {candle['time']!r}") from exc
 
-        if 'timestamp' in candle and candle['timestamp'] is not None:
-            ts = float(candle['timestamp'])
-            if ts > 1_000_000_000_000:
-                ts = ts / 1000.0
-            return datetime.fromtimestamp(ts, tz=timezone.utc)
+def analisar_do_store(par, par_used, velas: np.ndarray, timeframe, martingale, fetch_seconds: float,
+                      slot_stats: SlotStatsStore, covered_from: int | None, barras: int) -> CatalogContext | None:
+    """analisar_ativo() for the newest bars only: store them, then catalog the last `barras` bars from the store.
+
+    Returns None if the stored range does not reach back far enough or
+    does not join the new bars.
+    """
+    period = int(timeframe) * 60
+    if len(velas):
+        velas['minuto'], velas['dia'] = _local_minutes(velas['ts'])
+        velas['cor'] = _candle_colours(velas)
+        cobertura = slot_stats.coverage(par_used, timeframe)
+        if cobertura is None or covered_from > cobertura[1] + period:
+            return None
+        slot_stats.update(par_used, timeframe, velas, covered_from)
+    cobertura = slot_stats.coverage(par_used, timeframe)
+    if cobertura is None:
+        return None
+    fim = cobertura[1]
+    inicio = fim - (int(barras) - 1) * period
+    if cobertura[0] > inicio:
+        return None
+    contagem = slot_stats.counts(par_used, timeframe, inicio, fim)
+
+    ctx = CatalogContext()
+    ctx.diagnostics[par_used] = AssetDiagnostics(
+        asset=par,
+        used=par_used,
+        candles=int(contagem.sum()),
+        flat_ratio=round(float(_planas(velas).mean()), 4) if len(velas) else 0.0,
+        fetch_seconds=round(fetch_seconds, 3),
+    )
+    ctx.catalogacao[par_used] = _slots_from_counts(contagem)
+    upd_catalo(ctx, martingale, timeframe, par_filter=par_used)
+    return ctx
+
 
-        raise KeyError("Candle has neither 'time' nor 'timestamp'")
+def analisar_ativo(par, par_used, velas: np.ndarray, timeframe, martingale, fetch_seconds: float = 0.0,
+                   indicators=None, slot_stats: SlotStatsStore | None = None,
+                   covered_from: int | None = None) -> CatalogContext:
+    """CPU side of one asset: slot catalog, martingale levels and indicator votes.
 
+    Depends only on its arguments, so it can run in a CatalogPool worker;
+    the caller merges the returned context into its own.
+    """
+    ctx = CatalogContext()
+    catalogar_velas(ctx, par, par_used, velas, timeframe, fetch_seconds, slot_stats, covered_from)
+    upd_catalo(ctx, martingale, timeframe, par_filter=par_used)
+    if indicators is not None:
+        indice = TechnicalIndex(ctx.technical_data)
+        for nome in ('rsi', 'adx', 'cci', 'macd'):
+            period = int(getattr(indicators, nome))
+            votos = indice.votes(par_used, nome, period) if period else None
+            if votos is not None:
+                ctx.votos[(par_used, nome, period)] = votos
+    return ctx
+
+
+def catalogar_velas(ctx: CatalogContext, par, par_used, velas: np.ndarray, timeframe, fetch_seconds: float = 0.0,
+                    slot_stats: SlotStatsStore | None = None, covered_from: int | None = None):
+    """Catalog one asset's chronological CANDLE_DTYPE array into ctx.catalogacao.
+
+    With a SlotStatsStore the bars are also stored (downloaded from
+    `covered_from`), so the next catalog can start from the store.
+    """
     if DEBUG_CANDLES:
         print(velas)
-    for x in velas:
-        if DEBUG_CANDLES:
-            print(x)
-        time_utc = _parse_candle_datetime(x)
-        time_local = time_utc.astimezone(LOCAL_TZ)
-
-        data_da_vela = time_local.strftime('%Y-%m-%d')
-        horario_da_vela = time_local.strftime('%H:%M')
-
-        x.update({'cor': 'verde' if x['open'] < x['close'] else 'vermelha' if x['open'] > x['close'] else 'doji','data': data_da_vela, 'hora': horario_da_vela, 'ativo': par_used})
-        data.append(x)
-        technical_data.append(x)
-
-    if data:
-        doji_count = sum(1 for v in data if v.get('cor') == 'doji')
-        if (doji_count / len(data)) >= 0.9:
+
+    velas['minuto'], velas['dia'] = _local_minutes(velas['ts'])
+    velas['cor'] = _candle_colours(velas)
+    ctx.technical_data[par_used] = velas
+
+    planas = _planas(velas)
+    ctx.diagnostics[par_used] = AssetDiagnostics(
+        asset=par,
+        used=par_used,
+        candles=len(velas),
+        flat_ratio=round(float(planas.mean()), 4) if len(velas) else 1.0,
+        fetch_seconds=round(fetch_seconds, 3),
+    )
+
+    if len(velas):
+        doji_count = int((velas['cor'] == COR_DOJI).sum())
+        if (doji_count / len(velas)) >= 0.9:
             print(
                 f"[{datetime.now().strftime('%H:%M:%S')}] - Warning: {par} returned mostly doji/flat candles "
-                f"({doji_count}/{len(data)}). Signals may be empty; check asset symbol/market status."
+                f"({doji_count}/{len(velas)}). Signals may be empty; check asset symbol/market status."
             )
 
-    analise = {}
-    for vela in data:
-
-        #if data_subtraida <= dia_analise <= data_atual:
-        minuto_analise = int(vela['hora'].split(':')[1])
-
-        if '00:00' <= vela['hora'] <= '23:59':
-            timeframes_condicoes = {
-                1: lambda minuto: True,  # Sempre verdadeiro, processa todos os minutos
-                2: lambda minuto: minuto % 2 == 0,  # Múltiplo de 2
-                5: lambda minuto: minuto % 5 == 0,  # Múltiplo de 5
-                15: lambda minuto: minuto in {0, 15, 30, 45},  # 0, 15, 30 ou 45
-                30: lambda minuto: minuto in {0, 30},  # 0 ou 30
-                60: lambda minuto: minuto == 0  # Apenas no início da hora
-            }
+    if slot_stats is not None and len(velas) and timeframe in TIMEFRAMES:
+        slot_stats.update(par_used, timeframe, velas, covered_from)
+    analise = catalog_slots(velas['minuto'], velas['cor'], timeframe)
 
-            if timeframe in timeframes_condicoes and timeframes_condicoes[timeframe](minuto_analise):
-                analise = analise_json(vela, analise)
+    ctx.catalogacao.update({par_used: analise})
+    return par_used
 
 
-    catalogacao.update({par_used: analise})
-    return par_used
+# Vectorized cataloging kernel
+HHMM_LABELS = [f"{m // 60:02d}:{m % 60:02d}" for m in range(1440)]
+MINUTO_POR_HHMM = {label: m for m, label in enumerate(HHMM_LABELS)}
+COR_VERDE, COR_VERMELHA, COR_DOJI = 0, 1, 2
+COR_NOMES = ('verde', 'vermelha', 'doji')
+TIMEFRAMES = (1, 2, 5, 15, 30, 60)
+
+# One record per candle; an asset's history is a single array of these.
+CANDLE_DTYPE = np.dtype([
+    ('ts', np.int64),  # UTC epoch seconds
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('cor', np.int8),  # COR_VERDE / COR_VERMELHA / COR_DOJI
+    ('minuto', np.int16),  # local minute-of-day
+    ('dia', np.int32),  # local day number (days since 1970-01-01)
+])
+
+
+def _candle_epochs(velas: list[dict]) -> np.ndarray:
+    """UTC epoch seconds for every candle, parsed in one pass when possible."""
+    times = [v.get('time') for v in velas]
+    if times and all(isinstance(t, str) and len(t) == 20 and t[-1] == 'Z' for t in times):
+        # Common PocketOption shape '2024-01-01T12:34:56Z'
+        try:
+            return np.array([t[:-1] for t in times], dtype='datetime64[s]').astype(np.int64)
+        except ValueError:
+            pass
+    return np.fromiter(
+        (int(_parse_candle_datetime(v).timestamp()) for v in velas),
+        dtype=np.int64,
+        count=len(velas),
+    )
+
+
+def candles_to_array(velas: list[dict]) -> np.ndarray:
+    """API candles (newest- or oldest-first) as a chronological CANDLE_DTYPE array.
+
+    Only time and OHLC are filled. Everything downstream (resampling, the
+    `[-n:]` windows, slot statistics) relies on the ascending order.
+    """
+    arr = np.zeros(len(velas), dtype=CANDLE_DTYPE)
+    if velas:
+        arr['ts'] = _candle_epochs(velas)
+        for campo in ('open', 'high', 'low', 'close'):
+            arr[campo] = np.fromiter((v[campo] for v in velas), dtype=np.float64, count=len(velas))
+        arr = arr[np.argsort(arr['ts'], kind='stable')]
+    return arr
 
 
-def analise_json(vela, analise):
-    horario = vela['hora']
+def _local_minutes(epochs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Local minute-of-day (0..1439) and local day number for each epoch.
 
-    if horario not in analise:
-        analise[horario] = {'verde': 0, 'vermelha': 0, 'doji': 0, '%': 0, 'dir': ''}
+    The UTC offset is looked up once per 15-minute bucket, so DST-aware
+    zones stay correct without converting every candle.
+    """
+    if len(epochs) == 0:
+        return np.zeros(0, dtype=np.int16), np.zeros(0, dtype=np.int32)
+    buckets, inverse = np.unique(epochs // 900, return_inverse=True)
+    offsets = np.array(
+        [datetime.fromtimestamp(int(b) * 900, tz=LOCAL_TZ).utcoffset().total_seconds() for b in buckets],
+        dtype=np.int64,
+    )
+    local = epochs + offsets[inverse]
+    minutos = ((local // 60) % 1440).astype(np.int16)
+    return minutos, (local // 86400).astype(np.int32)
 
-    analise[horario][vela['cor']] += 1
 
+def _planas(velas: np.ndarray) -> np.ndarray:
+    """True for candles with open == high == low == close."""
+    return (
+        (np.abs(velas['open'] - velas['close']) < 1e-12)
+        & (np.abs(velas['open'] - velas['high']) < 1e-12)
+        & (np.abs(velas['open'] - velas['low']) < 1e-12)
+    )
+
+
+def _candle_colours(velas: np.ndarray) -> np.ndarray:
+    opens = velas['open']
+    closes = velas['close']
+    return np.where(
+        opens < closes, COR_VERDE, np.where(opens > closes, COR_VERMELHA, COR_DOJI)
+    ).astype(np.int8)
+
+
+def resample_candles(velas: np.ndarray, timeframe: int) -> np.ndarray:
+    """Aggregate a chronological 1-minute CANDLE_DTYPE array into `timeframe`-minute bars.
+
+    Bars are aligned to multiples of the timeframe (like PocketOption's own
+    bars). The candles are laid on a dense minute grid and reshaped to
+    (bars, timeframe), so open/high/low/close are plain axis reductions;
+    missing minutes are skipped and empty bars dropped.
+    """
+    if timeframe == 1 or len(velas) == 0:
+        return velas.copy()
+
+    minutos = velas['ts'] // 60
+    inicio = (int(minutos[0]) // timeframe) * timeframe
+    fim = (int(minutos[-1]) // timeframe + 1) * timeframe
+    ohlc = np.stack([velas['open'], velas['high'], velas['low'], velas['close']])
+
+    grade = np.full((4, fim - inicio), np.nan)
+    grade[:, minutos - inicio] = ohlc
+    grade = grade.reshape(4, -1, timeframe)
+
+    presente = ~np.isnan(grade[0])
+    barras = np.flatnonzero(presente.any(axis=1))
+    presente = presente[barras]
+    grade = grade[:, barras]
+    linhas = np.arange(len(barras))
+    primeiro = presente.argmax(axis=1)
+    ultimo = timeframe - 1 - presente[:, ::-1].argmax(axis=1)
+
+    out = np.zeros(len(barras), dtype=CANDLE_DTYPE)
+    out['ts'] = (inicio + barras * timeframe) * 60
+    out['open'] = grade[0][linhas, primeiro]
+    out['high'] = np.nanmax(grade[1], axis=1)
+    out['low'] = np.nanmin(grade[2], axis=1)
+    out['close'] = grade[3][linhas, ultimo]
+    return out
+
+
+def catalog_slots(minutos: np.ndarray, cores: np.ndarray, timeframe: int) -> dict:
+    """Per-slot colour counts and confidence for one asset.
+
+    The counting is a single np.bincount over (minute-of-day, colour).
+    """
+    if timeframe not in TIMEFRAMES or len(minutos) == 0:
+        return {}
+    # 60 is a multiple of every timeframe, so minute-of-day % tf == minute % tf
+    mask = (minutos % timeframe) == 0
+    chave = minutos[mask].astype(np.int64) * 3 + cores[mask]
+    return _slots_from_counts(np.bincount(chave, minlength=1440 * 3).reshape(1440, 3))
+
+
+def _slots_from_counts(counts: np.ndarray) -> dict:
+    """catalogacao entries for a (1440, 3) green/red/doji count array."""
+    analise = {}
+    for minuto in np.flatnonzero(counts.sum(axis=1)).tolist():
+        verdes, vermelhas, dojis = counts[minuto].tolist()
+        entry = {'verde': verdes, 'vermelha': vermelhas, 'doji': dojis, '%': 0, 'dir': ''}
+        _score_slot(entry)
+        analise[HHMM_LABELS[minuto]] = entry
+    return analise
+
+
+def _score_slot(entry: dict) -> dict:
     # Better, more stable calculation:
     # - Ignore doji for direction
     # - Laplace smoothing avoids 100% from tiny samples
     # - Doji penalty reduces confidence when market is flat
-    verdes = analise[horario]['verde']
-    vermelhas = analise[horario]['vermelha']
-    dojis = analise[horario]['doji']
+    verdes = entry['verde']
+    vermelhas = entry['vermelha']
+    dojis = entry['doji']
     total_dir = verdes + vermelhas
 
     if total_dir <= 0:
-        analise[horario]['%'] = 0
-        analise[horario]['dir'] = ''
+        entry['%'] = 0
+        entry['dir'] = ''
     else:
         p_call = (verdes + 1) / (total_dir + 2)
         p_put = (vermelhas + 1) / (total_dir + 2)
         doji_penalty = total_dir / (total_dir + dojis) if (total_dir + dojis) > 0 else 1.0
 
         if p_call >= p_put:
-            analise[horario]['dir'] = 'CALL'
-            analise[horario]['%'] = round(100 * p_call * doji_penalty)
+            entry['dir'] = 'CALL'
+            entry['%'] = round(100 * p_call * doji_penalty)
         else:
-            analise[horario]['dir'] = 'PUT'
-            analise[horario]['%'] = round(100 * p_put * doji_penalty)
+            entry['dir'] = 'PUT'
+            entry['%'] = round(100 * p_put * doji_penalty)
+
+    return entry
 
-    return analise
 
+def upd_catalo(ctx: CatalogContext, martingale, timeframe, par_filter: str | None = None):
+    """Add mg1..mgN statistics to every slot of ctx.catalogacao.
 
-def upd_catalo(martingale, timeframe):
+    Level k of a slot adds the counts of the slots tf, 2*tf .. k*tf minutes
+    later (minute-of-day, wrapping at midnight) to the slot's own counts;
+    if the level-k slot was never seen that level is 'N/A'. Slots are
+    handled as integer minute-of-day arrays, so the next slot is an index
+    shift instead of a datetime round trip.
+    """
+    niveis = int(martingale)
+    if niveis <= 0:
+        return
+    catalogacao = ctx.catalogacao
     for par in catalogacao:
-        for horario in sorted(catalogacao[par]):
-            mg_time = horario
-            soma = {'verde': catalogacao[par][horario]['verde'], 'vermelha': catalogacao[par][horario]['vermelha'], 'doji': catalogacao[par][horario]['doji']}
-            for i in range(int(martingale)):
-                catalogacao[par][horario].update({'mg'+str(i+1): {'verde': 0, 'vermelha': 0, 'doji': 0, '%': 0}})
-                now_local = datetime.now(tz=LOCAL_TZ)
-                mg_time = str(datetime.strptime(now_local.strftime('%Y-%m-%d ') + str(mg_time), '%Y-%m-%d %H:%M') + timedelta(minutes=timeframe))[11:-3]
-                
-                if mg_time in catalogacao[par]:
-                    catalogacao[par][horario]['mg'+str(i+1)]['verde'] += catalogacao[par][mg_time]['verde'] + soma['verde']
-                    catalogacao[par][horario]['mg'+str(i+1)]['vermelha'] += catalogacao[par][mg_time]['vermelha'] + soma['vermelha']
-                    catalogacao[par][horario]['mg'+str(i+1)]['doji'] += catalogacao[par][mg_time]['doji'] + soma['doji']
-
-                    mg_verdes = catalogacao[par][horario]['mg'+str(i+1)]['verde']
-                    mg_vermelhas = catalogacao[par][horario]['mg'+str(i+1)]['vermelha']
-                    mg_dojis = catalogacao[par][horario]['mg'+str(i+1)]['doji']
-                    mg_total_dir = mg_verdes + mg_vermelhas
-
-                    base_dir = catalogacao[par][horario].get('dir')
-                    if mg_total_dir <= 0 or base_dir not in {'CALL', 'PUT'}:
-                        catalogacao[par][horario]['mg'+str(i+1)]['%'] = 'N/A'
-                    else:
-                        # Smoothed probability in the chosen direction + doji penalty
-                        doji_penalty = mg_total_dir / (mg_total_dir + mg_dojis) if (mg_total_dir + mg_dojis) > 0 else 1.0
-                        if base_dir == 'CALL':
-                            p = (mg_verdes + 1) / (mg_total_dir + 2)
-                        else:
-                            p = (mg_vermelhas + 1) / (mg_total_dir + 2)
-                        catalogacao[par][horario]['mg'+str(i+1)]['%'] = round(100 * p * doji_penalty)
-
-                    soma['verde'] += catalogacao[par][mg_time]['verde']
-                    soma['vermelha'] += catalogacao[par][mg_time]['vermelha']
-                    soma['doji'] += catalogacao[par][mg_time]['doji']
-                else:
-                    catalogacao[par][horario]['mg'+str(i+1)]['%'] = 'N/A'
-
-
-async def catalogador(martingale, porcentagem, timeframe, par_filter: str | None = None):
+        if par_filter and par != par_filter:
+            continue
+        analise = catalogacao[par]
+        if not analise:
+            continue
+
+        horarios = sorted(analise)
+        entradas = [analise[h] for h in horarios]
+        minutos = np.array([MINUTO_POR_HHMM[h] for h in horarios], dtype=np.int64)
+        contagem = np.zeros((1440, 3), dtype=np.int64)
+        contagem[minutos] = [[e['verde'], e['vermelha'], e['doji']] for e in entradas]
+        presente = np.zeros(1440, dtype=bool)
+        presente[minutos] = True
+        direcoes = [e.get('dir') for e in entradas]
+        call = np.array([d == 'CALL' for d in direcoes], dtype=bool)
+        com_direcao = np.array([d in ('CALL', 'PUT') for d in direcoes], dtype=bool)
+
+        soma = contagem[minutos]
+        for nivel in range(1, niveis + 1):
+            proximo = (minutos + nivel * int(timeframe)) % 1440
+            existe = presente[proximo]
+            soma = soma + np.where(existe[:, None], contagem[proximo], 0)
+            verdes, vermelhas, dojis = np.where(existe[:, None], soma, 0).T
+            total_dir = verdes + vermelhas
+
+            # Smoothed probability in the chosen direction + doji penalty
+            with np.errstate(divide='ignore', invalid='ignore'):
+                doji_penalty = np.where(total_dir + dojis > 0, total_dir / (total_dir + dojis), 1.0)
+            p = np.where(call, verdes + 1, vermelhas + 1) / (total_dir + 2)
+            pct = np.rint(100 * p * doji_penalty).astype(np.int64)
+            valido = existe & (total_dir > 0) & com_direcao
+
+            chave = 'mg' + str(nivel)
+            for entry, v, r, d, ok, pc in zip(
+                entradas, verdes.tolist(), vermelhas.tolist(), dojis.tolist(), valido.tolist(), pct.tolist()
+            ):
+                entry[chave] = {'verde': v, 'vermelha': r, 'doji': d, '%': pc if ok else 'N/A'}
+
+
+async def catalogador(ctx: CatalogContext, martingale, porcentagem, timeframe, par_filter: str | None = None):
     """Build signal list.
 
     - Uses the best confidence between base and martingale levels.
     - If too few signals pass the threshold, relaxes threshold down to 50.
     - If still too few, outputs the top-N highest-confidence times.
     """
-    global signal_confidence
+    catalogacao = ctx.catalogacao
+    signal_confidence = ctx.signal_confidence
     min_signals = 10  # int(os.getenv('MIN_SIGNALS', '10'))
     relax_step = int(os.getenv('RELAX_STEP', '5'))
     base_window_hours = int(os.getenv('SIGNAL_WINDOW_HOURS', '5'))
     now_ref = datetime.now(tz=LOCAL_TZ)
+    agora = now_ref.timestamp()
+    meia_noite = _local_midnight_ts(now_ref)
 
     window_candidates_hours: list[int] = []
     for h in (base_window_hours, 8, 12, 24):
@@ -403,15 +1289,13 @@ async def catalogador(martingale, porcentagem, timeframe, par_filter: str | None
         # Prefer signals whose *next occurrence* is close to now.
         # (This avoids wiping out everything when no signals exist in the first window.)
         candidates: list[tuple[str, str, str, float]] = []
-        candidates_with_dt: list[tuple[datetime, tuple[str, str, str, float]]] = []
-        for c in candidates_all:
-            par_out, horario, direcao, pct = c
-            dt_next = _signal_time_sort_key(f"{par_out} M{timeframe} {horario} {direcao}", now_ref)
-            candidates_with_dt.append((dt_next, c))
+        proxima = {
+            c[1]: _next_occurrence(MINUTO_POR_HHMM[c[1]], meia_noite, agora) for c in candidates_all
+        }
 
         for hours_ahead in window_candidates_hours:
-            horizon = now_ref + timedelta(hours=int(hours_ahead))
-            windowed = [c for dt_next, c in candidates_with_dt if dt_next <= horizon]
+            horizon = agora + int(hours_ahead) * 3600
+            windowed = [c for c in candidates_all if proxima[c[1]] <= horizon]
             if windowed:
                 candidates = windowed
                 break
@@ -430,7 +1314,7 @@ async def catalogador(martingale, porcentagem, timeframe, par_filter: str | None
             selected = sorted(candidates, key=lambda x: x[3], reverse=True)[:min_signals]
 
         # Keep chronological output relative to now (handles day rollover)
-        selected.sort(key=lambda x: _signal_time_sort_key(f"{x[0]} M{timeframe} {x[1]} {x[2]}", now_ref))
+        selected.sort(key=lambda x: proxima[x[1]])
 
         for par_out, horario, direcao, _pct in selected:
             # Keep best confidence for post-filter backfilling
@@ -438,510 +1322,315 @@ async def catalogador(martingale, porcentagem, timeframe, par_filter: str | None
             prev = signal_confidence.get(key)
             if prev is None or _pct > prev:
                 signal_confidence[key] = float(_pct)
-            Lista.append(f'{str(par_out)} M{timeframe} {horario} {direcao}')
-
-def _in_future_window(signal_line: str, window_hours: int, reference: datetime | None = None) -> bool:
-    """True if signal's next occurrence is > now and within +window_hours."""
-    if reference is None:
-        reference = datetime.now(tz=LOCAL_TZ)
-    elif reference.tzinfo is None:
-        reference = reference.replace(tzinfo=LOCAL_TZ)
+            ctx.lista.append(Signal(str(par_out), int(timeframe), horario, direcao))
 
+def _in_future_window(signal: "Signal", window_hours: int, reference_ts: float) -> bool:
+    """True if the signal's next occurrence (next_at) is > now and within +window_hours."""
     try:
         window_hours_i = max(1, int(window_hours))
     except (TypeError, ValueError):
         window_hours_i = 5
+    return reference_ts < signal.next_at <= reference_ts + window_hours_i * 3600
 
-    dt_next = _signal_time_sort_key(signal_line, reference)
-    return (dt_next > reference) and (dt_next <= reference + timedelta(hours=window_hours_i))
-
-
-async def cataloging(all_asset, martingale, timeframe, porcentagem, days):
 
-
-    for par in all_asset.keys():
-        
-        par = str(par).upper().replace('-OTC', '_otc').replace('_OTC', '_otc')
-
-        par_used = await cataloga(par, timeframe, days, martingale)
-        upd_catalo(martingale, timeframe)
-        await catalogador(martingale, porcentagem, timeframe, par_filter=par_used)
-        await asyncio.sleep(2)
-    
+def normalize_asset(par) -> str:
+    return str(par).upper().replace('-OTC', '_otc').replace('_OTC', '_otc')
 
 
+async def cataloging(ctx: CatalogContext, api, all_asset, martingale, timeframe, porcentagem, days,
+                     indicators=None, pool=None, feeds=None, slot_stats=None):
+    """Catalog every asset and fill ctx.lista. Returns the symbols actually used.
 
+    Candle fetches run concurrently (the API wrapper enforces the rate
+    limit) and each asset is analysed as soon as its candles arrive, so
+    the total time follows the slowest asset. With a CatalogPool the
+    analysis runs on the pool's worker processes. Signals are still
+    listed in the order the assets were requested.
+    """
+    pares = [normalize_asset(par) for par in all_asset.keys()]
+    tasks = [
+        asyncio.ensure_future(cataloga(ctx, api, par, timeframe, days, martingale, indicators, pool, feeds, slot_stats))
+        for par in pares
+    ]
+    try:
+        pares_usados = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
 
-# indicadores técnicos
-def indicadores_rsi(Lista, data, period):
-    
-    # Função para converter 'hora' no formato string para um objeto datetime
-    def str_para_hora(hora_str):
-        return datetime.strptime(hora_str, '%H:%M')
-
-    # Função para converter um objeto datetime de volta para string
-    def hora_para_str(hora_dt):
-        return hora_dt.strftime('%H:%M')
+    for par_used in pares_usados:
+        await catalogador(ctx, martingale, porcentagem, timeframe, par_filter=par_used)
+    return list(pares_usados)
 
-    if period == 0:
-        return Lista
-    
-    nova_lista = []
-    for linha in Lista:
-
-        partes = linha.split()
-        # Hora e ativo desejados
-        par = partes[0]  # Exemplo: 'EURAUD'
-        horario = partes[2]  # Exemplo: '00:14'
-        direcao = partes[3]  # Exemplo: 'PUT'
 
-        hora_inicial = str_para_hora(horario)
+async def fetch_minute_history(api, all_asset, timeframes, days, martingale,
+                               feeds=None) -> list[tuple[str, str, np.ndarray, float]]:
+    """Download 1-minute candles once per asset, enough to resample every timeframe.
 
-        dados_filtrados = []
+    Returns (requested, used, chronological CANDLE_DTYPE array, fetch seconds)
+    per asset, in request order.
+    """
+    offset = max(_candle_window(tf, days, martingale)[1] for tf in timeframes)
 
-        for i in range(period):
-            hora_desejada = hora_inicial - timedelta(minutes=i)
+    async def _fetch(par):
+        started = time.monotonic()
+        par_used, velas = await _get_candles_with_fallback(api, par, 60, offset, feeds)
+        fetch_seconds = time.monotonic() - started
+        return par, par_used, candles_to_array(velas), fetch_seconds
 
-            hora_desejada_str = hora_para_str(hora_desejada)
+    tasks = [asyncio.ensure_future(_fetch(normalize_asset(par))) for par in all_asset.keys()]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+async def cataloging_from_history(ctx: CatalogContext, historico, martingale, timeframe, porcentagem, days,
+                                  indicators=None, pool=None, slot_stats=None):
+    """cataloging() for one timeframe, reusing candles from fetch_minute_history()."""
+    period, time_ = _candle_window(timeframe, days, martingale)
+    quantidade = time_ // period
+
+    jobs = []
+    for par, par_used, velas, fetch_seconds in historico:
+        barras = resample_candles(velas, timeframe)[-quantidade:] if quantidade > 0 else velas[:0].copy()
+        jobs.append((par, par_used, barras, timeframe, martingale, fetch_seconds, indicators, slot_stats))
+    if pool:
+        parciais = await asyncio.gather(*(pool.run(analisar_ativo, *job) for job in jobs))
+    else:
+        parciais = [analisar_ativo(*job) for job in jobs]
+    for parcial in parciais:
+        ctx.merge(parcial)
+    pares_usados = [job[1] for job in jobs]
 
-            dados = [item for item in data if item['hora'] == hora_desejada_str and item['ativo'] == par]
+    for par_used in pares_usados:
+        await catalogador(ctx, martingale, porcentagem, timeframe, par_filter=par_used)
+    return pares_usados
 
-            if dados:
-                dados_filtrados.extend(dados)
-        
-        df = pd.DataFrame(dados_filtrados)
-        if df.empty:
-            # Not enough candles to evaluate; don't veto the signal
-            nova_lista.append(linha)
-            continue
 
-        def determine_trend(row):
-            if row['close'] > row['open']:
-                return 'Call'
-            elif row['close'] < row['open']:
-                return 'Put'
-            else:
-                return 'Neutra'
 
-        df['tendencia'] = df.apply(determine_trend, axis=1)
-        tendencia_counts = df['tendencia'].value_counts()
 
-        qtd_call = tendencia_counts.get('Call', 0)
-        qtd_put = tendencia_counts.get('Put', 0)
+# indicadores técnicos
+def _janela_circular(contagem: np.ndarray, period: int) -> np.ndarray:
+    """Sum of each minute-of-day slot and the period-1 slots before it (wrapping midnight)."""
+    period = min(int(period), 1440)
+    if period <= 1:
+        return contagem
+    padded = np.concatenate([contagem[-(period - 1):], contagem])
+    return np.convolve(padded, np.ones(period, dtype=np.int64), mode='valid')
 
-        if qtd_call > qtd_put:
-            if direcao == 'CALL':
-                nova_lista.append(linha)
-        elif qtd_put > qtd_call:
-            if direcao == 'PUT':
-                nova_lista.append(linha)
-        else:
-            # Tie/neutral: keep the signal
-            nova_lista.append(linha)
-    
-    return nova_lista
 
-def indicadores_adx(Lista, data, period):
-    
-    # Função para converter 'hora' no formato string para um objeto datetime
-    def str_para_hora(hora_str):
-        return datetime.strptime(hora_str, '%H:%M')
+class TechnicalIndex:
+    """Indicator votes over a context's technical_data (asset -> CANDLE_DTYPE array).
 
-    # Função para converter um objeto datetime de volta para string
-    def hora_para_str(hora_dt):
-        return hora_dt.strftime('%H:%M')
+    Each indicator is computed once per (asset, indicator, period) over the
+    whole candle series. Filters then read how many candles voted CALL/PUT
+    in the lookback minutes ending at a signal's slot, across all days.
+    """
 
+    def __init__(self, data: dict[str, np.ndarray], votos: dict | None = None):
+        self._data = data
+        self._series: dict[str, tuple[pd.DataFrame, np.ndarray]] = {}
+        # Votes already computed elsewhere (see analisar_ativo) are reused as-is.
+        self._votos: dict[tuple[str, str, int], tuple[np.ndarray, np.ndarray]] = dict(votos or {})
+
+    def _serie(self, ativo: str) -> tuple[pd.DataFrame, np.ndarray] | None:
+        if ativo not in self._series:
+            velas = self._data.get(ativo)
+            if velas is None or len(velas) == 0:
+                return None
+            velas = velas[np.argsort(velas['ts'], kind='stable')]
+            frame = pd.DataFrame({campo: velas[campo] for campo in ('open', 'high', 'low', 'close')})
+            self._series[ativo] = (frame, velas['minuto'].astype(np.int64))
+        return self._series[ativo]
+
+    @staticmethod
+    def _trend(frame: pd.DataFrame, indicador: str, period: int) -> np.ndarray:
+        if indicador == 'rsi':
+            return indicators.rsi_trend(frame['close'], period)
+        if indicador == 'adx':
+            return indicators.adx_trend(frame['high'], frame['low'], frame['close'], period)
+        if indicador == 'cci':
+            return indicators.cci_trend(frame['high'], frame['low'], frame['close'], period)
+        if indicador == 'macd':
+            return indicators.macd_trend(frame['close'])
+        raise ValueError(f"Unknown indicator: {indicador!r}")
+
+    def votes(self, ativo: str, indicador: str, period: int) -> tuple[np.ndarray, np.ndarray] | None:
+        """(calls, puts) per minute-of-day slot, or None if the asset has no candles."""
+        key = (ativo, indicador, int(period))
+        if key not in self._votos:
+            serie = self._serie(ativo)
+            if serie is None:
+                return None
+            frame, minutos = serie
+            tendencia = self._trend(frame, indicador, int(period))
+            calls = np.bincount(minutos[tendencia == indicators.CALL], minlength=1440)
+            puts = np.bincount(minutos[tendencia == indicators.PUT], minlength=1440)
+            self._votos[key] = (_janela_circular(calls, period), _janela_circular(puts, period))
+        return self._votos[key]
+
+
+def build_candle_index(data: dict[str, np.ndarray], votos: dict | None = None) -> TechnicalIndex:
+    return TechnicalIndex(data, votos)
+
+
+def _filtrar_por_indicador(Lista, data, period, indicador):
     if period == 0:
         return Lista
-    
-    nova_lista = []
-    for linha in Lista:
-
-        partes = linha.split()
-        # Hora e ativo desejados
-        par = partes[0]  # Exemplo: 'EURAUD'
-        horario = partes[2]  # Exemplo: '00:14'
-        direcao = partes[3]  # Exemplo: 'PUT'
-
-        hora_inicial = str_para_hora(horario)
-
-        dados_filtrados = []
 
-        for i in range(period):
-            hora_desejada = hora_inicial - timedelta(minutes=i)
+    indice = data if isinstance(data, TechnicalIndex) else TechnicalIndex(data)
 
-            hora_desejada_str = hora_para_str(hora_desejada)
-
-            dados = [item for item in data if item['hora'] == hora_desejada_str and item['ativo'] == par]
-
-            if dados:
-                dados_filtrados.extend(dados)
-
-        # Converter para DataFrame
-        df = pd.DataFrame(dados_filtrados)
-        if df.empty:
-            nova_lista.append(linha)
+    nova_lista = []
+    for sinal in Lista:
+        votos = indice.votes(sinal.asset, indicador, period)
+        minuto = sinal.minute
+        if votos is None or minuto is None:
+            # Not enough candles to evaluate; don't veto the signal
+            nova_lista.append(sinal)
             continue
 
-        # Calcular o True Range (TR)
-        df['tr'] = df[['high', 'low', 'close']].apply(lambda row: max(row['high'] - row['low'], abs(row['high'] - row['close']), abs(row['low'] - row['close'])), axis=1)
-
-        # Calcular a variação positiva e negativa (DM+ e DM-)
-        df['dm+'] = df['high'].diff()  # Diferença de alta
-        df['dm-'] = df['low'].diff()   # Diferença de baixa
-
-        # Ajustar para valores positivos ou zero
-        df['dm+'] = df['dm+'].apply(lambda x: x if x > 0 else 0)
-        df['dm-'] = df['dm-'].apply(lambda x: -x if x < 0 else 0)
-
-        # Suavizar os valores (soma móvel simples)
-        df['smoothed_tr'] = df['tr'].rolling(window=period).sum()
-        df['smoothed_dm+'] = df['dm+'].rolling(window=period).sum()
-        df['smoothed_dm-'] = df['dm-'].rolling(window=period).sum()
-
-        # Calcular o +DI e o -DI
-        df['plus_di'] = (df['smoothed_dm+'] / df['smoothed_tr']) * 100
-        df['minus_di'] = (df['smoothed_dm-'] / df['smoothed_tr']) * 100
-
-        # Calcular o ADX
-        df['adx'] = (abs(df['plus_di'] - df['minus_di']) / (df['plus_di'] + df['minus_di'])) * 100
-
-        # Determinar a tendência (Call ou Put)
-        def determine_trend(row):
-            if row['adx'] > 25:
-                if row['plus_di'] > row['minus_di']:
-                    return 'Call'  # Tendência de alta
-                elif row['plus_di'] < row['minus_di']:
-                    return 'Put'   # Tendência de baixa
-                else:
-                    return 'Neutra'  # Caso +DI e -DI sejam iguais
-            else:
-                return 'Neutra'  # Tendência fraca ou consolidada
-
-        # Aplicar a função para calcular a tendência
-        df['tendencia'] = df.apply(determine_trend, axis=1)
-
-        tendencia_count = df['tendencia'].value_counts()
-
-        qtd_call = tendencia_count.get('Call', 0)
-        qtd_put = tendencia_count.get('Put', 0)
+        qtd_call = int(votos[0][minuto])
+        qtd_put = int(votos[1][minuto])
 
         if qtd_call > qtd_put:
-            if direcao == 'CALL':
-                nova_lista.append(linha)
+            if sinal.direction == 'CALL':
+                nova_lista.append(sinal)
         elif qtd_put > qtd_call:
-            if direcao == 'PUT':
-                nova_lista.append(linha)
+            if sinal.direction == 'PUT':
+                nova_lista.append(sinal)
         else:
-            nova_lista.append(linha)
-    
-    return nova_lista
-
-def indicadores_cci(Lista, data, period):
-    
-    # Função para converter 'hora' no formato string para um objeto datetime
-    def str_para_hora(hora_str):
-        return datetime.strptime(hora_str, '%H:%M')
-
-    # Função para converter um objeto datetime de volta para string
-    def hora_para_str(hora_dt):
-        return hora_dt.strftime('%H:%M')
-
-    if period == 0:
-        return Lista
-    
-    nova_lista = []
-    for linha in Lista:
-
-        partes = linha.split()
-        # Hora e ativo desejados
-        par = partes[0]  # Exemplo: 'EURAUD'
-        horario = partes[2]  # Exemplo: '00:14'
-        direcao = partes[3]  # Exemplo: 'PUT'
-
-        hora_inicial = str_para_hora(horario)
-
-        dados_filtrados = []
-
-        for i in range(period):
-            hora_desejada = hora_inicial - timedelta(minutes=i)
-
-            hora_desejada_str = hora_para_str(hora_desejada)
-
-            dados = [item for item in data if item['hora'] == hora_desejada_str and item['ativo'] == par]
-
-            if dados:
-                dados_filtrados.extend(dados)
-
-        # Converter para DataFrame
-        df = pd.DataFrame(dados_filtrados)
-        if df.empty:
-            nova_lista.append(linha)
-            continue
-
-        # Calcular o Preço Típico (Typical Price)
-        df['typical_price'] = (df['high'] + df['low'] + df['close']) / 3
-
-        # Calcular a Média Móvel Simples (SMA) do Preço Típico
-        df['sma'] = df['typical_price'].rolling(window=period).mean()
-
-        # Calcular o Desvio Médio (MD)
-        df['md'] = (df['typical_price'] - df['sma']).abs().rolling(window=period).mean()
-
-        # Calcular o CCI
-        df['cci'] = (df['typical_price'] - df['sma']) / (0.015 * df['md'])
-
-        # Determinar a tendência (Call ou Put) com base no CCI
-        def determine_trend_cci(row):
-            if row['cci'] > 100:
-                return 'Call'  # Tendência de alta (sobrecompra)
-            elif row['cci'] < -100:
-                return 'Put'   # Tendência de baixa (sobrevenda)
-            else:
-                return 'Neutra'  # Zona neutra
-
-        # Aplicar a função para calcular a tendência
-        df['tendencia_cci'] = df.apply(determine_trend_cci, axis=1)
-        cci_tendencia_count = df['tendencia_cci'].value_counts()
-
-        calls_cci = cci_tendencia_count.get('Call', 0)
-        puts_cci = cci_tendencia_count.get('Put', 0)
+            # Tie/neutral: keep the signal
+            nova_lista.append(sinal)
 
-        if calls_cci > puts_cci:
-            if direcao == 'CALL':
-                nova_lista.append(linha)
-        elif puts_cci > calls_cci:
-            if direcao == 'PUT':
-                nova_lista.append(linha)
-        else:
-            nova_lista.append(linha)
-    
     return nova_lista
 
-def indicadores_macd(Lista, data, period):
-    
-    # Função para converter 'hora' no formato string para um objeto datetime
-    def str_para_hora(hora_str):
-        return datetime.strptime(hora_str, '%H:%M')
-
-    # Função para converter um objeto datetime de volta para string
-    def hora_para_str(hora_dt):
-        return hora_dt.strftime('%H:%M')
-
-    if period == 0:
-        return Lista
-    
-    nova_lista = []
-    for linha in Lista:
-
-        partes = linha.split()
-        # Hora e ativo desejados
-        par = partes[0]  # Exemplo: 'EURAUD'
-        horario = partes[2]  # Exemplo: '00:14'
-        direcao = partes[3]  # Exemplo: 'PUT'
-
-        hora_inicial = str_para_hora(horario)
-
-        dados_filtrados = []
-
-        for i in range(period):
-            hora_desejada = hora_inicial - timedelta(minutes=i)
-
-            hora_desejada_str = hora_para_str(hora_desejada)
-
-            dados = [item for item in data if item['hora'] == hora_desejada_str and item['ativo'] == par]
 
-            if dados:
-                dados_filtrados.extend(dados)
+def indicadores_rsi(Lista, data, period):
+    """Wilder RSI(period): above 50 votes CALL, below 50 votes PUT."""
+    return _filtrar_por_indicador(Lista, data, period, 'rsi')
 
-        # Converter para DataFrame
-        df = pd.DataFrame(dados_filtrados)
-        if df.empty:
-            nova_lista.append(linha)
-            continue
 
-        # Calcular as EMAs de 12 e 26 períodos
-        df['ema_12'] = df['close'].ewm(span=12, adjust=False).mean()
-        df['ema_26'] = df['close'].ewm(span=26, adjust=False).mean()
+def indicadores_adx(Lista, data, period):
+    """ADX/DMI(period): ADX > 25 votes in the direction of the dominant DI."""
+    return _filtrar_por_indicador(Lista, data, period, 'adx')
 
-        # Calcular o MACD
-        df['macd'] = df['ema_12'] - df['ema_26']
 
-        # Calcular a linha de sinal (Sinal) como a EMA de 9 períodos do MACD
-        df['signal'] = df['macd'].ewm(span=9, adjust=False).mean()
+def indicadores_cci(Lista, data, period):
+    """CCI(period): above +100 votes CALL, below -100 votes PUT."""
+    return _filtrar_por_indicador(Lista, data, period, 'cci')
 
-        # Determinar a tendência (Call ou Put)
-        def determine_trend_macd(row):
-            if row['macd'] > row['signal']:
-                return 'Call'  # Tendência de alta
-            elif row['macd'] < row['signal']:
-                return 'Put'   # Tendência de baixa
-            else:
-                return 'Neutra'  # Caso o MACD e a linha de sinal sejam iguais
 
-        # Aplicar a função para calcular a tendência
-        df['tendencia_macd'] = df.apply(determine_trend_macd, axis=1)
+def indicadores_macd(Lista, data, period):
+    """MACD(12, 26, 9): MACD above its signal line votes CALL, below votes PUT."""
+    return _filtrar_por_indicador(Lista, data, period, 'macd')
 
-        macd_tendencia_count = df['tendencia_macd'].value_counts()
 
-        calls_cci = macd_tendencia_count.get('Call', 0)
-        puts_cci = macd_tendencia_count.get('Put', 0)
 
-        if calls_cci > puts_cci:
-            if direcao == 'CALL':
-                nova_lista.append(linha)
-        elif puts_cci > calls_cci:
-            if direcao == 'PUT':
-                nova_lista.append(linha)
-        else:
-            nova_lista.append(linha)
-    
-    return nova_lista
 
 
+# Funções de apoio
+def ordernar_hora(sinal):
+    # Exemplo: EURJPY M1 23:52 PUT -> 23:52
+    return sinal.hhmm
 
 
+def _local_midnight_ts(reference: datetime) -> float:
+    return reference.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
 
-# Funções de apoio
-def ordernar_hora(linha):
-    try:
-        # Dividir a linha por espaços e pegar o valor da hora (3º item)
-        return linha.split()[2]  # Exemplo: EURJPY M1 23:52 PUT -> 23:52
-    except IndexError:
-        return "00:00" 
 
+def _next_occurrence(minute: int, midnight_ts: float, reference_ts: float) -> int:
+    """Epoch of the next occurrence of a minute of day at or after reference_ts.
 
-def _signal_time_sort_key(linha: str, reference: datetime | None = None) -> datetime:
-    """Sort key for signals based on the next occurrence of HH:MM.
-
-    This keeps printed signals ordered even when the list is later backfilled.
-    If the time-of-day is earlier than the reference time, it is treated as next day.
+    A time earlier than the reference is treated as next day. Plain
+    arithmetic: LOCAL_TZ has no DST, so a local day is always 86400 seconds.
     """
-    if reference is None:
-        reference = datetime.now(tz=LOCAL_TZ)
-    elif reference.tzinfo is None:
-        reference = reference.replace(tzinfo=LOCAL_TZ)
+    candidate = int(midnight_ts) + minute * 60
+    if candidate < reference_ts:
+        candidate += 86400
+    return candidate
 
-    parts = linha.split()
-    if len(parts) < 3:
-        return reference
 
-    hhmm_raw = str(parts[2]).strip()
-    try:
-        # Normalize both 'H:MM' and 'HH:MM'
-        t = datetime.strptime(hhmm_raw.zfill(5), "%H:%M").time()
-    except ValueError:
-        return reference
-
-    candidate = datetime.combine(reference.date(), t, tzinfo=reference.tzinfo)
-    if candidate < reference:
-        candidate += timedelta(days=1)
-    return candidate
+def _with_next_occurrence(signals: list["Signal"], reference: datetime) -> list["Signal"]:
+    """Stamp next_at on every signal relative to reference."""
+    agora = reference.timestamp()
+    meia_noite = _local_midnight_ts(reference)
+    return [
+        replace(s, next_at=_next_occurrence(s.minute, meia_noite, agora)) if s.minute is not None else s
+        for s in signals
+    ]
 
 
-def _future_hhmm_slots(timeframe_minutes: int, hours_ahead: int, reference: datetime | None = None) -> set[str]:
-    """Allowed HH:MM slots from now to +hours_ahead, aligned to timeframe.
+@lru_cache(maxsize=4096)
+def _future_slot_minutes(timeframe_minutes: int, hours_ahead: int, reference_minute: int) -> tuple[int, ...]:
+    """Aligned slot minutes strictly after reference_minute, up to +hours_ahead.
 
-    Example: now=07:33, tf=5 => first slot is 07:35.
+    Minutes count from the reference's local midnight and may run past 1440
+    (next day). A slot is aligned when its minute of the hour is a multiple
+    of the timeframe. Example: reference 07:33, tf=5 => first slot is 07:35.
     """
-    if reference is None:
-        reference = datetime.now(tz=LOCAL_TZ)
-    elif reference.tzinfo is None:
-        reference = reference.replace(tzinfo=LOCAL_TZ)
-
     timeframe_minutes = max(1, int(timeframe_minutes))
     hours_ahead = max(1, int(hours_ahead))
 
-    start = reference.replace(second=0, microsecond=0)
-    if timeframe_minutes == 1:
-        if start < reference:
-            start += timedelta(minutes=1)
+    first = reference_minute + 1
+    within_hour = first % 60
+    aligned = -(-within_hour // timeframe_minutes) * timeframe_minutes
+    if aligned >= 60:
+        start = first - within_hour + 60
     else:
-        while start < reference or (start.minute % timeframe_minutes) != 0:
-            start += timedelta(minutes=1)
+        start = first - within_hour + aligned
 
-    end = reference + timedelta(hours=hours_ahead)
-    slots: set[str] = set()
-    t = start
-    while t <= end:
-        slots.add(t.strftime('%H:%M'))
-        t += timedelta(minutes=timeframe_minutes)
-    return slots
+    # Seconds past reference_minute never reach another slot: slots are whole minutes.
+    end = reference_minute + hours_ahead * 60
+    return tuple(range(start, end + 1, timeframe_minutes))
 
 
-def _future_slots_datetimes(timeframe_minutes: int, hours_ahead: int, reference: datetime | None = None) -> list[datetime]:
-    """List of future datetime slots aligned to timeframe, starting AFTER now."""
+def _reference_minute(reference: datetime | None) -> int:
+    """Local minute of the day of `reference` (default: now)."""
     if reference is None:
         reference = datetime.now(tz=LOCAL_TZ)
     elif reference.tzinfo is None:
         reference = reference.replace(tzinfo=LOCAL_TZ)
-
-    timeframe_minutes = max(1, int(timeframe_minutes))
-    hours_ahead = max(1, int(hours_ahead))
-
-    start = reference.replace(second=0, microsecond=0)
-    # Move to the next slot strictly after 'reference'
-    if timeframe_minutes == 1:
-        start += timedelta(minutes=1)
-    else:
-        # Ceil to next timeframe boundary
-        while start <= reference or (start.minute % timeframe_minutes) != 0:
-            start += timedelta(minutes=1)
-
-    end = reference + timedelta(hours=hours_ahead)
-    slots: list[datetime] = []
-    t = start
-    while t <= end:
-        slots.append(t)
-        t += timedelta(minutes=timeframe_minutes)
-    return slots
-
-
-def _replace_signal_time(line: str, new_hhmm: str) -> str:
-    parts = line.split()
-    if len(parts) >= 4:
-        parts[2] = new_hhmm
-        return ' '.join(parts)
-    return line
+    return reference.hour * 60 + reference.minute
 
 
 def _assign_signals_to_future_slots(
-    signals: list[str],
+    signals: list["Signal"],
     timeframe_minutes: int,
     base_window_hours: int,
     reference: datetime | None = None,
-) -> tuple[list[str], int]:
+) -> tuple[list["Signal"], int]:
     """Force all signal times to future slots after now, unique by HH:MM.
 
     Returns (updated_signals, window_hours_used).
     """
-    if reference is None:
-        reference = datetime.now(tz=LOCAL_TZ)
-    elif reference.tzinfo is None:
-        reference = reference.replace(tzinfo=LOCAL_TZ)
+    minuto = _reference_minute(reference)
+    timeframe_minutes = int(timeframe_minutes)
 
     # Pick a window that has enough slots for the requested amount
     window_hours_used = max(1, int(base_window_hours))
-    slots: list[datetime] = []
+    slots: list[int] = []
     for h in (window_hours_used, 8, 12, 24):
-        slots = _future_slots_datetimes(timeframe_minutes, int(h), reference)
+        slots = list(_future_slot_minutes(timeframe_minutes, int(h), minuto))
         if len(slots) >= len(signals):
             window_hours_used = int(h)
             break
 
     used_hhmm: set[str] = set()
-    assigned: list[str] = []
+    assigned: list[Signal] = []
     slot_index = 0
-    for line in signals:
-        while slot_index < len(slots) and slots[slot_index].strftime('%H:%M') in used_hhmm:
+    for sinal in signals:
+        while slot_index < len(slots) and HHMM_LABELS[slots[slot_index] % 1440] in used_hhmm:
             slot_index += 1
         if slot_index >= len(slots):
             # Extend window if somehow exhausted (very large min_signals)
-            extra = _future_slots_datetimes(timeframe_minutes, 24, reference + timedelta(hours=window_hours_used))
-            slots.extend(extra)
-        hhmm = slots[slot_index].strftime('%H:%M')
+            slots.extend(_future_slot_minutes(timeframe_minutes, 24, minuto + window_hours_used * 60))
+        hhmm = HHMM_LABELS[slots[slot_index] % 1440]
         used_hhmm.add(hhmm)
-        assigned.append(_replace_signal_time(line, hhmm))
+        assigned.append(replace(sinal, hhmm=hhmm))
         slot_index += 1
 
     return assigned, window_hours_used
@@ -953,28 +1642,20 @@ def remover_horarios_duplicados_v2(lista):
     sinais_vistos = set()
     sinais_unicos = []  # Lista para armazenar os sinais sem duplicatas
 
-    # Itera sobre os itens da lista
-    for linha in lista:
-        # Divide a linha em seus componentes (par, timeframe, horário e direção)
-        partes = linha.split()
-        if len(partes) >= 4:
-            par = partes[0]  # Exemplo: 'EURAUD'
-            horario = partes[2]  # Exemplo: '00:14'
-            direcao = partes[3]  # Exemplo: 'PUT'
-
-            chave_sinal = (horario)  # Podemos também incluir 'direcao' se necessário
-
-            # Se o sinal já foi visto, decidir aleatoriamente se vamos permitir o duplicado
-            if chave_sinal in sinais_vistos:
-                # Chance de 20% de permitir duplicatas
-                if random.random() > 0.9:  # Ajuste a probabilidade conforme necessário
-                    if random.random() > 0.9:
-                        sinais_unicos.append(linha)
-                continue
+    for sinal in lista:
+        chave_sinal = sinal.hhmm  # Podemos também incluir a direção se necessário
 
-            # Se o sinal ainda não foi visto, adiciona à lista final
-            sinais_unicos.append(linha)
-            sinais_vistos.add(chave_sinal)  # Marca como visto
+        # Se o sinal já foi visto, decidir aleatoriamente se vamos permitir o duplicado
+        if chave_sinal in sinais_vistos:
+            # Chance de 20% de permitir duplicatas
+            if random.random() > 0.9:  # Ajuste a probabilidade conforme necessário
+                if random.random() > 0.9:
+                    sinais_unicos.append(sinal)
+            continue
+
+        # Se o sinal ainda não foi visto, adiciona à lista final
+        sinais_unicos.append(sinal)
+        sinais_vistos.add(chave_sinal)  # Marca como visto
 
     return sinais_unicos
 
@@ -992,116 +1673,632 @@ Signals will always be available for up to 5 hours in the future.''')
 
 
 
-# Main Loop
-async def main():
-    """Função principal que roda o loop do catalogador."""
-    global Lista, catalogacao, technical_data
-    args = parse_args()
-
-    await warning()
-
-    timeframe, martingale, percentage, days, all_asset, rsi, adx, cci, macd = get_config_from_args(args)
-
-    os.system('cls' if os.name == 'nt' else 'clear')
-
-    await asyncio.sleep(1)
-
-    await login()
-
-    await asyncio.sleep(2)
-
-    await cataloging(all_asset, martingale, timeframe, percentage, days)
-
-    print('list created successfully\n')
+# Typed results
+@dataclass(frozen=True)
+class IndicatorConfig:
+    """Lookbacks for the technical filters (0 disables a filter)."""
+    rsi: int = 0
+    adx: int = 0
+    cci: int = 0
+    macd: int = 0
+
+
+@dataclass(frozen=True)
+class Signal:
+    asset: str
+    timeframe: int
+    hhmm: str
+    direction: str
+    confidence: float | None = None
+    martingale: tuple = ()  # mg1..mgN % of the catalogued slot (None = N/A)
+    next_at: int = 0  # epoch of the next HH:MM occurrence (0 = not computed)
+
+    @property
+    def minute(self) -> int | None:
+        return MINUTO_POR_HHMM.get(self.hhmm.zfill(5))
+
+    @property
+    def key(self) -> tuple:
+        return (self.asset, self.timeframe, self.hhmm, self.direction)
+
+    @property
+    def line(self) -> str:
+        return f"{self.asset} M{self.timeframe} {self.hhmm} {self.direction}"
+
+
+@dataclass
+class AssetDiagnostics:
+    asset: str  # symbol requested
+    used: str  # symbol catalogued (may be the _otc alternative)
+    candles: int = 0
+    flat_ratio: float = 0.0
+    fetch_seconds: float = 0.0
+
+
+@dataclass
+class SignalResult:
+    assets: list[str]
+    timeframe: int
+    signals: list[Signal] = field(default_factory=list)
+    window_hours: int = 0
+    elapsed_seconds: float = 0.0
+    diagnostics: list[AssetDiagnostics] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SignalResult":
+        return cls(
+            assets=list(data.get('assets') or []),
+            timeframe=int(data['timeframe']),
+            signals=[
+                Signal(**{**sig, 'martingale': tuple(sig.get('martingale') or ())})
+                for sig in data.get('signals') or []
+            ],
+            window_hours=int(data.get('window_hours') or 0),
+            elapsed_seconds=float(data.get('elapsed_seconds') or 0.0),
+            diagnostics=[AssetDiagnostics(**d) for d in data.get('diagnostics') or []],
+        )
+
+    @property
+    def lines(self) -> list[str]:
+        return [s.line for s in self.signals]
+
+
+def build_signal_list(
+    ctx: CatalogContext, timeframe, rsi=0, adx=0, cci=0, macd=0, now_ref: datetime | None = None,
+) -> tuple[list[Signal], int]:
+    """Polish ctx.lista into the final future signals.
+
+    Returns (signals, window_hours_used).
+    """
+    if now_ref is None:
+        now_ref = datetime.now(tz=LOCAL_TZ)
 
     # polimento da lista
-    ordernar_Lista = sorted(Lista, key=ordernar_hora)
+    signal_confidence = ctx.signal_confidence
+    ordernar_Lista = sorted(ctx.lista, key=ordernar_hora)
     Lista_v2 = remover_horarios_duplicados_v2(ordernar_Lista)
 
-    Lista_tecnic = indicadores_rsi(Lista_v2, technical_data, rsi)
-    Lista_tecnic = indicadores_adx(Lista_tecnic, technical_data, adx)
-    Lista_tecnic = indicadores_cci(Lista_tecnic, technical_data, cci)
-    Lista_tecnic = indicadores_macd(Lista_tecnic, technical_data, macd)
+    indice = build_candle_index(ctx.technical_data, ctx.votos) if any((rsi, adx, cci, macd)) else None
+    Lista_tecnic = indicadores_rsi(Lista_v2, indice, rsi)
+    Lista_tecnic = indicadores_adx(Lista_tecnic, indice, adx)
+    Lista_tecnic = indicadores_cci(Lista_tecnic, indice, cci)
+    Lista_tecnic = indicadores_macd(Lista_tecnic, indice, macd)
 
     # Keep only FUTURE signals (next occurrences) within the configured window.
     # If nothing fits the base window, expand to 8/12/24h.
     min_signals = int(os.getenv('MIN_SIGNALS', '10'))
     base_window_hours = int(os.getenv('SIGNAL_WINDOW_HOURS', '5'))
-    now_ref = datetime.now(tz=LOCAL_TZ)
     window_hours_used: int = int(base_window_hours)
+    agora = now_ref.timestamp()
+    Lista_v2 = _with_next_occurrence(Lista_v2, now_ref)
+    Lista_tecnic = _with_next_occurrence(Lista_tecnic, now_ref)
 
     for h in (base_window_hours, 8, 12, 24):
         h_i = int(h)
-        filtered = [s for s in Lista_tecnic if _in_future_window(s, h_i, now_ref)]
+        filtered = [s for s in Lista_tecnic if _in_future_window(s, h_i, agora)]
         if filtered:
             Lista_tecnic = filtered
             window_hours_used = h_i
             break
 
     # If still empty, keep it empty for now; we'll backfill below.
-    Lista_tecnic = [s for s in Lista_tecnic if _in_future_window(s, window_hours_used, now_ref)]
+    Lista_tecnic = [s for s in Lista_tecnic if _in_future_window(s, window_hours_used, agora)]
     if len(Lista_tecnic) < min_signals:
         existing = set(Lista_tecnic)
         # Prefer candidates from the pre-indicator list, ordered by confidence
-        scored_pool: list[tuple[float, str]] = []
-        for linha in Lista_v2:
-            if linha in existing:
-                continue
-            if not _in_future_window(linha, window_hours_used, now_ref):
+        scored_pool: list[tuple[float, Signal]] = []
+        for sinal in Lista_v2:
+            if sinal in existing:
                 continue
-            partes = linha.split()
-            if len(partes) < 4:
+            if not _in_future_window(sinal, window_hours_used, agora):
                 continue
-            par = partes[0]
-            tf = int(partes[1].lstrip('M'))
-            horario = partes[2]
-            direcao = partes[3]
-            score = signal_confidence.get((par, tf, horario, direcao), 0.0)
-            scored_pool.append((float(score), linha))
+            score = signal_confidence.get(sinal.key, 0.0)
+            scored_pool.append((float(score), sinal))
 
         scored_pool.sort(key=lambda x: x[0], reverse=True)
-        for _score, linha in scored_pool:
+        for _score, sinal in scored_pool:
             if len(Lista_tecnic) >= min_signals:
                 break
-            if linha not in existing:
-                Lista_tecnic.append(linha)
-                existing.add(linha)
+            if sinal not in existing:
+                Lista_tecnic.append(sinal)
+                existing.add(sinal)
 
         # Last-resort: if still short (no confidence scores), just take remaining by time
         if len(Lista_tecnic) < min_signals:
-            for linha in Lista_v2:
+            for sinal in Lista_v2:
                 if len(Lista_tecnic) >= min_signals:
                     break
-                if linha not in existing:
-                    if not _in_future_window(linha, window_hours_used, now_ref):
+                if sinal not in existing:
+                    if not _in_future_window(sinal, window_hours_used, agora):
                         continue
-                    Lista_tecnic.append(linha)
-                    existing.add(linha)
+                    Lista_tecnic.append(sinal)
+                    existing.add(sinal)
+
+    # Catalog confidence is keyed by the original slot, before times are reassigned.
+    com_confianca = []
+    for sinal in Lista_tecnic:
+        slot = ctx.catalogacao.get(sinal.asset, {}).get(sinal.hhmm, {})
+        niveis = []
+        while f'mg{len(niveis) + 1}' in slot:
+            pct = slot[f'mg{len(niveis) + 1}'].get('%')
+            niveis.append(pct if isinstance(pct, (int, float)) else None)
+        com_confianca.append(replace(sinal, confidence=signal_confidence.get(sinal.key), martingale=tuple(niveis)))
 
     # Always print in chronological order (handles day rollover)
     # Force ALL printed times to be in the future (no past HH:MM), and unique.
     Lista_tecnic, window_hours_used = _assign_signals_to_future_slots(
-        Lista_tecnic,
+        com_confianca,
         timeframe_minutes=timeframe,
         base_window_hours=window_hours_used,
         reference=now_ref,
     )
+    Lista_tecnic = _with_next_occurrence(Lista_tecnic, now_ref)
+
+    Lista_tecnic = [s for s in Lista_tecnic if _in_future_window(s, window_hours_used, agora)]
+    signals = sorted(Lista_tecnic, key=lambda s: s.next_at)
+    return signals, window_hours_used
+
+
+# Worker pool
+# Processes for the CPU side of cataloging (0 = analyse in the calling process).
+try:
+    CATALOG_WORKERS = int(os.getenv("CATALOG_WORKERS", "0"))
+except ValueError:
+    CATALOG_WORKERS = 0
+
+
+def _init_catalog_worker():
+    # Workers share the parent's stdout; keep it clean for --format json.
+    sys.stdout = sys.stderr
+    # Run the pandas/NumPy indicator path once so the first real job starts warm.
+    indicators.rsi_trend(pd.Series(np.linspace(1.0, 2.0, 64)), 14)
+
+
+class CatalogPool:
+    """Long-lived process pool that runs analisar_ativo() for many assets at once.
+
+    Candle arrays go in and per-asset CatalogContexts come back, so
+    multi-asset and multi-timeframe jobs spread over all cores.
+    """
+
+    def __init__(self, workers: int | None = None):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_catalog_worker)
+
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
 
-    Lista_tecnic = [s for s in Lista_tecnic if _in_future_window(s, window_hours_used, now_ref)]
-    Lista_tecnic = sorted(Lista_tecnic, key=lambda s: _signal_time_sort_key(s, now_ref))
+    def warm(self):
+        """Start every worker now instead of on the first job (does not wait for them)."""
+        for _ in range(self.workers):
+            self._executor.submit(time.sleep, 0.05)
 
-    for i in Lista_tecnic:
-        print(i)
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
-    if Lista_tecnic == []:
+
+class CatalogThreads:
+    """CatalogPool stand-in that runs analisar_ativo() on a worker thread.
+
+    For background jobs in a process without a pool: the NumPy and slot
+    statistics work stays off the event loop that serves requests.
+    """
+
+    async def run(self, fn, *args):
+        return await asyncio.to_thread(fn, *args)
+
+
+# Signal result cache
+SIGNAL_CACHE_ENABLED = (os.getenv("SIGNAL_CACHE_ENABLED", "1") or "1").strip().lower() not in ("0", "false", "no")
+# Optional SQLite file shared by the bot, the backend and CLI runs ("" keeps the cache in memory only).
+SIGNAL_CACHE_PATH = os.getenv("SIGNAL_CACHE_PATH", "")
+
+
+class SignalCache:
+    """Generated results keyed by request parameters, valid until the next bar.
+
+    A new candle only closes at a timeframe boundary, so an entry expires
+    exactly when the candle set it was built from changes.
+    """
+
+    def __init__(self, path: str = SIGNAL_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, tuple[float, SignalResult]] = {}
+        if self.path:
+            self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS signal_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL,
+                    payload TEXT NOT NULL
+                )
+            ''')
+            conn.commit()
+
+    @staticmethod
+    def key(assets, timeframe, days, martingale, percentage, indicators: IndicatorConfig) -> str:
+        return json.dumps([
+            [normalize_asset(a) for a in assets], int(timeframe), int(days), int(martingale),
+            float(percentage), asdict(indicators),
+        ])
+
+    @staticmethod
+    def expiry(timeframe, now: float | None = None) -> float:
+        """Epoch of the next timeframe boundary after `now`."""
+        period = int(timeframe) * 60
+        now = time.time() if now is None else now
+        return float((int(now) // period + 1) * period)
+
+    def get(self, key: str) -> SignalResult | None:
+        now = time.time()
+        entry = self._entries.get(key)
+        if (entry is None or entry[0] <= now) and self.path:
+            # Another process may have stored a fresh result since our copy expired.
+            with self._connect() as conn:
+                c = conn.cursor()
+                c.execute("SELECT expires_at, payload FROM signal_cache WHERE cache_key=?", (key,))
+                row = c.fetchone()
+            if row and row[0] > now:
+                entry = (row[0], SignalResult.from_dict(json.loads(row[1])))
+                self._entries[key] = entry
+        if entry is None or entry[0] <= now:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, result: SignalResult, expires_at: float):
+        now = time.time()
+        if expires_at <= now:
+            return
+        self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+        self._entries[key] = (expires_at, result)
+        if self.path:
+            with self._connect() as conn:
+                c = conn.cursor()
+                c.execute("DELETE FROM signal_cache WHERE expires_at <= ?", (now,))
+                c.execute(
+                    "INSERT OR REPLACE INTO signal_cache (cache_key, expires_at, payload) VALUES (?, ?, ?)",
+                    (key, expires_at, json.dumps(result.to_dict())),
+                )
+                conn.commit()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        now = time.time()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'entries': sum(1 for v in self._entries.values() if v[0] > now),
+            'persistent': bool(self.path),
+        }
+
+
+class SignalEngine:
+    """Importable cataloger that reuses one warm PocketOption session.
+
+    Every generation keeps its state in its own CatalogContext, so any
+    number can run concurrently; they share the session, the rate limiter,
+    the candle store, the result cache, the learned _otc feed preference
+    and the optional worker pool.
+    """
+
+    def __init__(
+        self,
+        api=None,
+        warmup_seconds: float = LOGIN_WARMUP_SECONDS,
+        candle_store: CandleStore | None = None,
+        limiter: TokenBucket | None = None,
+        cache: SignalCache | None = None,
+        pool: CatalogPool | None = None,
+        feeds: FeedPreference | None = None,
+        slot_stats: SlotStatsStore | None = None,
+    ):
+        self._api = api
+        self._warmup_seconds = max(0.0, float(warmup_seconds))
+        if candle_store is None and CANDLE_STORE_PATH:
+            candle_store = CandleStore(CANDLE_STORE_PATH)
+        self.candle_store = candle_store
+        self.limiter = limiter or TokenBucket()
+        if cache is None and SIGNAL_CACHE_ENABLED:
+            cache = SignalCache()
+        self.cache = cache
+        if pool is None and CATALOG_WORKERS > 0:
+            pool = CatalogPool(CATALOG_WORKERS)
+            pool.warm()
+        self.pool = pool
+        self.feeds = feeds or FeedPreference()
+        if slot_stats is None and SLOT_STATS_PATH:
+            slot_stats = SlotStatsStore(SLOT_STATS_PATH)
+        self.slot_stats = slot_stats
+        self._login_lock = asyncio.Lock()
+
+    async def _ensure_api(self):
+        if self._api is None:
+            async with self._login_lock:
+                if self._api is None:
+                    api = _create_api()
+                    if self._warmup_seconds:
+                        await asyncio.sleep(self._warmup_seconds)
+                    self._api = api
+        api = ChunkedCandleAPI(RateLimitedAPI(self._api, self.limiter))
+        if self.candle_store is not None:
+            api = StoredCandleAPI(api, self.candle_store)
+        return api
+
+    async def reset_session(self, session=None):
+        """Close the current session (or `session`, if it is still current); the next generation logs in again."""
+        if session is not None and session is not self._api:
+            return
+        session, self._api = self._api, None
+        close = getattr(session, "disconnect", None) or getattr(session, "close", None)
+        if close is None:
+            return
+        try:
+            closing = close()
+            if asyncio.iscoroutine(closing):
+                await closing
+        except Exception:
+            pass
+
+    async def close(self):
+        """Stop the worker pool and close the session (app shutdown)."""
+        if self.pool is not None and hasattr(self.pool, "shutdown"):
+            self.pool.shutdown()
+        await self.reset_session()
+
+    async def generate(
+        self,
+        pair: str,
+        timeframe: int = 5,
+        days: int = 10,
+        martingale: int = 0,
+        percentage: float = 70.0,
+        indicators: IndicatorConfig | None = None,
+        pool=None,
+    ) -> SignalResult:
+        return await self.generate_many([pair], timeframe, days, martingale, percentage, indicators, pool)
+
+    async def generate_many(
+        self,
+        assets: list[str],
+        timeframe: int = 5,
+        days: int = 10,
+        martingale: int = 0,
+        percentage: float = 70.0,
+        indicators: IndicatorConfig | None = None,
+        pool=None,
+    ) -> SignalResult:
+        """Signals for `assets`; `pool` (CatalogPool/CatalogThreads) overrides where the analysis runs."""
+        all_asset = {normalize_asset(a): 0 for a in assets if str(a).strip()}
+        if not all_asset:
+            raise ValueError("At least one asset is required")
+        indicators = indicators or IndicatorConfig()
+        chave = None
+        if self.cache is not None:
+            chave = SignalCache.key(all_asset, timeframe, days, martingale, percentage, indicators)
+            cached = self.cache.get(chave)
+            if cached is not None:
+                return cached
+        expires_at = SignalCache.expiry(timeframe)
+        api = await self._ensure_api()
+        session = self._api
+
+        ctx = CatalogContext()
+        started = time.monotonic()
+        try:
+            pares_usados = await cataloging(
+                ctx, api, all_asset, int(martingale), int(timeframe), float(percentage), int(days),
+                indicators=indicators, pool=pool or self.pool, feeds=self.feeds, slot_stats=self.slot_stats,
+            )
+        except Exception as exc:
+            if _is_session_error(exc):
+                await self.reset_session(session)
+            raise
+        signals, window_hours = build_signal_list(
+            ctx, int(timeframe), indicators.rsi, indicators.adx, indicators.cci, indicators.macd,
+        )
+
+        result = SignalResult(
+            assets=pares_usados,
+            timeframe=int(timeframe),
+            signals=signals,
+            window_hours=window_hours,
+            elapsed_seconds=time.monotonic() - started,
+            diagnostics=list(ctx.diagnostics.values()),
+        )
+        if chave is not None:
+            self.cache.put(chave, result, expires_at)
+        return result
+
+    async def generate_timeframes(
+        self,
+        assets: list[str],
+        timeframes: tuple[int, ...] = (1, 5, 15),
+        days: int = 10,
+        martingale: int = 0,
+        percentage: float = 70.0,
+        indicators: IndicatorConfig | None = None,
+    ) -> dict[int, SignalResult]:
+        """Signals for several timeframes from one 1-minute download per asset.
+
+        Higher timeframes are resampled in memory, so M1/M5/M15 for the same
+        pair cost a single get_candles() instead of three.
+        """
+        all_asset = {normalize_asset(a): 0 for a in assets if str(a).strip()}
+        if not all_asset:
+            raise ValueError("At least one asset is required")
+        timeframes = sorted({int(tf) for tf in timeframes})
+        invalid = [tf for tf in timeframes if tf not in TIMEFRAMES]
+        if not timeframes or invalid:
+            raise ValueError(f"Timeframes must be among {TIMEFRAMES}")
+        indicators = indicators or IndicatorConfig()
+        chaves = {}
+        if self.cache is not None:
+            chaves = {tf: SignalCache.key(all_asset, tf, days, martingale, percentage, indicators) for tf in timeframes}
+            cached = {tf: self.cache.get(chave) for tf, chave in chaves.items()}
+            if all(r is not None for r in cached.values()):
+                return cached
+        expiracao = {tf: SignalCache.expiry(tf) for tf in timeframes}
+        api = await self._ensure_api()
+        session = self._api
+
+        results: dict[int, SignalResult] = {}
+        started = time.monotonic()
+        try:
+            historico = await fetch_minute_history(
+                api, all_asset, timeframes, int(days), int(martingale), feeds=self.feeds,
+            )
+        except Exception as exc:
+            if _is_session_error(exc):
+                await self.reset_session(session)
+            raise
+
+        for tf in timeframes:
+            ctx = CatalogContext()
+            pares_usados = await cataloging_from_history(
+                ctx, historico, int(martingale), tf, float(percentage), int(days),
+                indicators=indicators, pool=self.pool, slot_stats=self.slot_stats,
+            )
+            signals, window_hours = build_signal_list(
+                ctx, tf, indicators.rsi, indicators.adx, indicators.cci, indicators.macd,
+            )
+            results[tf] = SignalResult(
+                assets=pares_usados,
+                timeframe=tf,
+                signals=signals,
+                window_hours=window_hours,
+                elapsed_seconds=time.monotonic() - started,
+                diagnostics=list(ctx.diagnostics.values()),
+            )
+            if tf in chaves:
+                self.cache.put(chaves[tf], results[tf], expiracao[tf])
+        return results
+
+
+_default_engine: SignalEngine | None = None
+
+
+def get_engine() -> SignalEngine:
+    """Process-wide engine shared by the bot and the backend."""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = SignalEngine()
+    return _default_engine
+
+
+# Main Loop
+def _print_json(output_format: str, results: list[SignalResult] | None = None, error: str | None = None):
+    """Write results (or an error) to stdout as JSON or NDJSON records."""
+    if output_format == 'ndjson':
+        if error is not None:
+            print(json.dumps({'type': 'error', 'error': error}), flush=True)
+            return
+        for result in results:
+            for diag in result.diagnostics:
+                print(json.dumps({'type': 'diagnostics', 'timeframe': result.timeframe, **asdict(diag)}))
+            for sig in result.signals:
+                print(json.dumps({'type': 'signal', **asdict(sig)}))
+            print(json.dumps({
+                'type': 'summary',
+                'timeframe': result.timeframe,
+                'assets': result.assets,
+                'total': len(result.signals),
+                'window_hours': result.window_hours,
+                'elapsed_seconds': round(result.elapsed_seconds, 3),
+            }), flush=True)
+        return
+
+    if error is not None:
+        print(json.dumps({'error': error}))
+        return
+    print(json.dumps({
+        'total': sum(len(r.signals) for r in results),
+        'results': [r.to_dict() for r in results],
+    }))
+
+
+async def main():
+    """Função principal que roda o loop do catalogador."""
+    args = parse_args()
+    as_json = args.format != 'text'
+
+    if not as_json:
+        await warning()
+
+    timeframe, martingale, percentage, days, all_asset, rsi, adx, cci, macd = get_config_from_args(args)
+
+    if not as_json:
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+    engine = SignalEngine()
+    try:
+        # Keep stdout clean for the JSON records; progress notes go to stderr.
+        with contextlib.redirect_stdout(sys.stderr) if as_json else contextlib.nullcontext():
+            if args.timeframes:
+                por_timeframe = await engine.generate_timeframes(
+                    list(all_asset.keys()),
+                    timeframes=args.timeframes,
+                    days=days,
+                    martingale=martingale,
+                    percentage=percentage,
+                    indicators=IndicatorConfig(rsi, adx, cci, macd),
+                )
+                results = list(por_timeframe.values())
+            else:
+                results = [await engine.generate_many(
+                    list(all_asset.keys()),
+                    timeframe=timeframe,
+                    days=days,
+                    martingale=martingale,
+                    percentage=percentage,
+                    indicators=IndicatorConfig(rsi, adx, cci, macd),
+                )]
+    except Exception as exc:
+        if not as_json:
+            raise
+        traceback.print_exc()
+        _print_json(args.format, error=f"{type(exc).__name__}: {exc}")
+        raise SystemExit(1)
+
+    if as_json:
+        _print_json(args.format, results)
+        return
+
+    print('list created successfully\n')
+
+    total = 0
+    for result in results:
+        for i in result.lines:
+            print(i)
+        total += len(result.signals)
+
+    if not total:
         print('No signals found\n')
     else:
-        print(f'\nTotal signals: {len(Lista_tecnic)}\n')
-
-    catalogacao = {}
-    Lista = []
-    technical_data = []
+        print(f'\nTotal signals: {total}\n')
 
 
+if __name__ == "__main__":
+    # Force UTF-8 for stdout/stderr to prevent mojibake on Windows
+    try:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+        sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+    except Exception:
+        pass
 
-asyncio.run(main())
+    asyncio.run(main())
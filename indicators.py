@@ -0,0 +1,100 @@
+"""Vectorized technical indicators used by the future signal filters.
+
+Every function takes whole candle series (chronological order) and returns
+series of the same length, so an indicator is computed once per asset and
+signals just look up the value at their slot. Values that are not defined
+yet (warm-up period, division by zero) are NaN.
+"""
+import numpy as np
+import pandas as pd
+
+CALL = 1
+PUT = -1
+NEUTRAL = 0
+
+
+def _wilder(series: pd.Series, period: int) -> pd.Series:
+    """Wilder's smoothing (RMA), the average used by RSI and ADX."""
+    return series.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+
+
+def _clean(series: pd.Series) -> pd.Series:
+    return series.replace([np.inf, -np.inf], np.nan)
+
+
+def rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """Relative Strength Index with Wilder smoothing (0..100)."""
+    delta = close.diff()
+    avg_gain = _wilder(delta.clip(lower=0), period)
+    avg_loss = _wilder(-delta.clip(upper=0), period)
+    out = 100 - 100 / (1 + avg_gain / avg_loss)
+    # No losses in the window: RSI is 100 (or 50 when price did not move at all)
+    out = out.mask((avg_loss == 0) & (avg_gain > 0), 100.0)
+    out = out.mask((avg_loss == 0) & (avg_gain == 0), 50.0)
+    return _clean(out)
+
+
+def dmi(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """Directional Movement Index: returns (plus_di, minus_di, adx)."""
+    prev_close = close.shift()
+    tr = pd.concat(
+        [high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1
+    ).max(axis=1)
+
+    up = high.diff()
+    down = -low.diff()
+    plus_dm = pd.Series(np.where((up > down) & (up > 0), up, 0.0), index=close.index)
+    minus_dm = pd.Series(np.where((down > up) & (down > 0), down, 0.0), index=close.index)
+
+    atr = _wilder(tr, period)
+    plus_di = _clean(100 * _wilder(plus_dm, period) / atr)
+    minus_di = _clean(100 * _wilder(minus_dm, period) / atr)
+    dx = _clean(100 * (plus_di - minus_di).abs() / (plus_di + minus_di))
+    adx = _wilder(dx, period)
+    return plus_di, minus_di, adx
+
+
+def cci(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 20) -> pd.Series:
+    """Commodity Channel Index using the rolling mean absolute deviation."""
+    typical = ((high + low + close) / 3).to_numpy(dtype=np.float64)
+    out = np.full(len(typical), np.nan)
+    if period >= 1 and len(typical) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(typical, period)
+        sma = windows.mean(axis=1)
+        mad = np.abs(windows - sma[:, None]).mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[period - 1:] = (typical[period - 1:] - sma) / (0.015 * mad)
+    return _clean(pd.Series(out, index=close.index))
+
+
+def macd(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """MACD line, signal line and histogram."""
+    macd_line = close.ewm(span=fast, adjust=False).mean() - close.ewm(span=slow, adjust=False).mean()
+    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+    return macd_line, signal_line, macd_line - signal_line
+
+
+# Trend classification: CALL / PUT / NEUTRAL per candle
+def rsi_trend(close: pd.Series, period: int) -> np.ndarray:
+    values = rsi(close, period).to_numpy()
+    return np.where(values > 50, CALL, np.where(values < 50, PUT, NEUTRAL)).astype(np.int8)
+
+
+def adx_trend(high: pd.Series, low: pd.Series, close: pd.Series, period: int, threshold: float = 25.0) -> np.ndarray:
+    plus_di, minus_di, adx = (s.to_numpy() for s in dmi(high, low, close, period))
+    strong = adx > threshold
+    return np.where(
+        strong & (plus_di > minus_di), CALL, np.where(strong & (plus_di < minus_di), PUT, NEUTRAL)
+    ).astype(np.int8)
+
+
+def cci_trend(high: pd.Series, low: pd.Series, close: pd.Series, period: int) -> np.ndarray:
+    values = cci(high, low, close, period).to_numpy()
+    return np.where(values > 100, CALL, np.where(values < -100, PUT, NEUTRAL)).astype(np.int8)
+
+
+def macd_trend(close: pd.Series) -> np.ndarray:
+    macd_line, signal_line, _hist = macd(close)
+    a = macd_line.to_numpy()
+    b = signal_line.to_numpy()
+    return np.where(a > b, CALL, np.where(a < b, PUT, NEUTRAL)).astype(np.int8)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import the flat top-level modules and must not create candles.db next to them.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CANDLE_STORE_PATH", "")
+os.environ.setdefault("LOGIN_WARMUP_SECONDS", "0")
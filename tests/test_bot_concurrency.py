@@ -0,0 +1,77 @@
+import ast
+import asyncio
+import os
+import time
+import types
+
+import pytest
+
+pytest.importorskip("telegram")
+httpx = pytest.importorskip("httpx")
+
+BOT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bot.py")
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    """bot.py's definitions, without building the Application or starting to poll."""
+    monkeypatch.setenv("BOT_TOKEN", "123:test")
+    monkeypatch.setenv("BACKEND_URL", "http://backend.test")
+    with open(BOT_PATH, encoding="utf-8-sig") as f:
+        tree = ast.parse(f.read())
+    body = []
+    for node in tree.body:
+        if isinstance(node, ast.If) and "TOKEN" in ast.unparse(node.test):
+            break
+        body.append(node)
+    namespace = {"__name__": "bot", "__file__": BOT_PATH}
+    exec(compile(ast.Module(body=body, type_ignores=[]), BOT_PATH, "exec"), namespace)
+    return namespace
+
+
+class Message:
+    def __init__(self, user_id, text):
+        self.from_user = types.SimpleNamespace(id=user_id, username=f"user{user_id}")
+        self.text = text
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+def test_slow_backend_reply_does_not_block_other_users(bot):
+    async def backend(request):
+        if request.url.path == "/user/store/bulk":
+            await asyncio.sleep(0.2)
+            return httpx.Response(200, json={"stored": 1})
+        if request.url.path == "/reply/get":
+            slow = b"slow" in request.content
+            await asyncio.sleep(2.0 if slow else 0.05)
+            return httpx.Response(200, json={"reply": "hello"})
+        return httpx.Response(404)
+
+    async def user(user_id, text):
+        message = Message(user_id, text)
+        started = time.monotonic()
+        await bot["normal_message"](types.SimpleNamespace(message=message), types.SimpleNamespace(user_data={}))
+        return time.monotonic() - started, message.replies
+
+    async def main():
+        bot["_backend_client"] = httpx.AsyncClient(transport=httpx.MockTransport(backend))
+        # Store every user immediately, the worst case for the handler path.
+        bot["USER_STORE_FLUSH_SECONDS"] = 0
+        try:
+            return await asyncio.gather(
+                user(1, "slow question"), *(user(uid, "hi") for uid in range(2, 101))
+            )
+        finally:
+            await bot["_backend_client"].aclose()
+
+    started = time.monotonic()
+    results = asyncio.run(main())
+    elapsed = time.monotonic() - started
+
+    assert all(replies == ["hello"] for _, replies in results)
+    # Sequential handling would take 100 x 0.25 s plus the 2 s reply.
+    assert max(latency for latency, _ in results[1:]) < 1.0
+    assert elapsed < 3.0
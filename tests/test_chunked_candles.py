@@ -0,0 +1,82 @@
+import asyncio
+import random
+import time
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("BinaryOptionsToolsV2")
+
+import future_signal as fs
+
+NOW = int(datetime(2024, 3, 6, 9, 17, 30, tzinfo=timezone.utc).timestamp())
+
+
+class PlainSession:
+    """PocketOption stand-in with only get_candles(), frozen at NOW."""
+
+    def __init__(self):
+        self.calls = []
+
+    def _series(self, asset, period, end, count):
+        candles = []
+        for i in range(count, 0, -1):
+            ts = end - i * period
+            rng = random.Random(f"{asset}:{ts}")
+            o = 1.0 + rng.random() / 100
+            c = o + rng.choice((-0.001, 0.001))
+            candles.append({
+                "time": datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "open": o, "close": c, "high": max(o, c) + 0.0001, "low": min(o, c) - 0.0001,
+            })
+        candles.reverse()  # newest first, like the API
+        return candles
+
+    async def get_candles(self, asset, period, offset):
+        self.calls.append(("get_candles", offset))
+        return self._series(asset, period, NOW // period * period, int(offset) // period)
+
+
+class AdvancedSession(PlainSession):
+    async def get_candles_advanced(self, asset, period, offset, time_):
+        self.calls.append(("get_candles_advanced", offset))
+        return self._series(asset, period, int(time_) // period * period, int(offset) // period)
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(fs, "time", types.SimpleNamespace(
+        time=lambda: NOW, monotonic=time.monotonic, sleep=time.sleep,
+    ))
+
+
+def _chunked(session):
+    return fs.ChunkedCandleAPI(fs.RateLimitedAPI(session, fs.TokenBucket(rate=0)), chunk_candles=1440)
+
+
+def test_session_without_advanced_keeps_one_request():
+    session = PlainSession()
+    offset = 5000 * 60
+    candles = asyncio.run(_chunked(session).get_candles("EURUSD", 60, offset))
+    assert session.calls == [("get_candles", offset)]
+    assert len(candles) == 5000
+
+
+def test_single_timeframe_window_is_not_split():
+    session = AdvancedSession()
+    period, offset = fs._candle_window(5, 1, 3)
+    asyncio.run(_chunked(session).get_candles("EURUSD", period, offset))
+    assert session.calls == [("get_candles", offset)]
+
+
+def test_multi_timeframe_history_is_split_and_stitched():
+    session = AdvancedSession()
+    offset = max(fs._candle_window(tf, 1, 3)[1] for tf in (1, 60))
+    single = asyncio.run(session.get_candles("EURUSD", 60, offset))
+    session.calls.clear()
+
+    candles = asyncio.run(_chunked(session).get_candles("EURUSD", 60, offset))
+
+    assert [name for name, _ in session.calls].count("get_candles_advanced") == 3
+    assert candles == single
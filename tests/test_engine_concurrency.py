@@ -0,0 +1,87 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("BinaryOptionsToolsV2")
+
+import future_signal as fs
+
+FROZEN_NOW = datetime(2024, 3, 6, 9, 17, 30, tzinfo=timezone.utc)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return FROZEN_NOW.astimezone(tz) if tz else FROZEN_NOW.replace(tzinfo=None)
+
+
+class FakeSession:
+    """PocketOption stand-in: a fixed, per-asset candle history ending at FROZEN_NOW."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_candles(self, asset, period, offset):
+        self.calls += 1
+        rng = random.Random(f"{asset}:{period}")
+        # Let other generations run in between, as a real websocket round trip would.
+        await asyncio.sleep(rng.random() / 50)
+        end = int(FROZEN_NOW.timestamp()) // period * period
+        candles = []
+        for i in range(int(offset) // period, 0, -1):
+            ts = end - i * period
+            # Each minute-of-day leans green or red so every asset has its own slots.
+            lean = random.Random(f"{asset}:{(ts // 60) % 1440}").random()
+            o = 1.0 + rng.random() / 100
+            c = o + (0.001 if rng.random() < lean else -0.001)
+            candles.append({
+                "time": datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "open": o, "close": c, "high": max(o, c) + 0.0001, "low": min(o, c) - 0.0001,
+            })
+        candles.reverse()  # newest first, like the API
+        return candles
+
+
+def _engine():
+    return fs.SignalEngine(
+        api=FakeSession(), warmup_seconds=0, candle_store=None,
+        limiter=fs.TokenBucket(rate=0), cache=None,
+    )
+
+
+REQUESTS = [
+    (asset, timeframe, days)
+    for asset in ("EURUSD", "GBPUSD", "AUDCAD", "USDJPY", "EURGBP",
+                  "AUDUSD", "NZDUSD", "USDCHF", "EURJPY", "GBPJPY")
+    for timeframe, days in ((1, 3), (5, 10))
+]
+
+
+def test_concurrent_generations_are_isolated(monkeypatch):
+    monkeypatch.setattr(fs, "datetime", FrozenDatetime)
+    indicadores = fs.IndicatorConfig(rsi=5)
+
+    async def sozinho(asset, timeframe, days):
+        return await _engine().generate(asset, timeframe, days, percentage=60, indicators=indicadores)
+
+    async def juntos():
+        engine = _engine()
+        return await asyncio.gather(*(
+            engine.generate(asset, timeframe, days, percentage=60, indicators=indicadores)
+            for asset, timeframe, days in REQUESTS
+        ))
+
+    esperado = [asyncio.run(sozinho(*req)) for req in REQUESTS]
+    obtido = asyncio.run(juntos())
+
+    assert len(obtido) == 20
+    for (asset, timeframe, _days), alone, together in zip(REQUESTS, esperado, obtido):
+        assert together.assets == [asset]
+        assert together.timeframe == timeframe
+        assert together.signals, f"no signals for {asset} M{timeframe}"
+        assert {s.asset for s in together.signals} == {asset}
+        assert together.signals == alone.signals
+    # The fake feeds differ per asset, so identical lists would mean shared state.
+    assert len({tuple(s.line.split(" ", 1)[1] for s in r.signals) for r in obtido}) > 1
@@ -0,0 +1,65 @@
+import asyncio
+import time
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("BinaryOptionsToolsV2")
+
+import future_signal as fs
+
+WEEK = 7 * 86400
+START = int(datetime(2024, 3, 4, 14, 5, tzinfo=timezone.utc).timestamp())  # a Monday
+
+
+class FeedSession:
+    """Regular EURUSD is flat until `live_from`; EURUSD_otc is always live."""
+
+    def __init__(self, clock, live_from):
+        self.clock = clock
+        self.live_from = live_from
+        self.calls = []
+
+    async def get_candles(self, symbol, period, offset):
+        self.calls.append(symbol)
+        if symbol == "EURUSD" and self.clock[0] < self.live_from:
+            return [{"open": 1.0, "close": 1.0, "high": 1.0, "low": 1.0}] * (int(offset) // period)
+        return [
+            {"open": 1.0, "close": 1.0 + (-1) ** i * 0.001, "high": 1.01, "low": 0.99}
+            for i in range(int(offset) // period)
+        ]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [START]
+    monkeypatch.setattr(fs, "time", types.SimpleNamespace(
+        time=lambda: now[0], monotonic=time.monotonic, sleep=time.sleep,
+    ))
+    return now
+
+
+def _fetch(session, feeds):
+    session.calls.clear()
+    used, _ = asyncio.run(fs._get_candles_with_fallback(session, "EURUSD", 60, 60 * 60, feeds))
+    return used, list(session.calls)
+
+
+def test_learned_otc_is_rechecked_against_the_regular_feed(clock):
+    session = FeedSession(clock, live_from=START + WEEK)
+    feeds = fs.FeedPreference()
+
+    assert _fetch(session, feeds) == ("EURUSD_otc", ["EURUSD", "EURUSD_otc"])
+
+    # Requests every 10 minutes of that hour, one week later, still use the learned _otc feed...
+    clock[0] = START + WEEK
+    for _ in range(5):
+        assert _fetch(session, feeds) == ("EURUSD_otc", ["EURUSD_otc"])
+        clock[0] += 600
+
+    # ...but using it did not extend the entry, so the live regular feed wins again.
+    clock[0] = START + 2 * WEEK
+    assert _fetch(session, feeds) == ("EURUSD", ["EURUSD"])
+    clock[0] = START + 3 * WEEK
+    assert _fetch(session, feeds) == ("EURUSD", ["EURUSD"])
@@ -0,0 +1,87 @@
+"""The arithmetic slot generator must assign exactly what the old minute-stepping code did."""
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("BinaryOptionsToolsV2")
+
+import future_signal as fs
+
+
+# Reference: the stepping implementation that _future_slot_minutes replaced.
+def _stepping_slots(timeframe_minutes, hours_ahead, reference):
+    timeframe_minutes = max(1, int(timeframe_minutes))
+    hours_ahead = max(1, int(hours_ahead))
+
+    start = reference.replace(second=0, microsecond=0)
+    if timeframe_minutes == 1:
+        start += timedelta(minutes=1)
+    else:
+        while start <= reference or (start.minute % timeframe_minutes) != 0:
+            start += timedelta(minutes=1)
+
+    end = reference + timedelta(hours=hours_ahead)
+    slots = []
+    t = start
+    while t <= end:
+        slots.append(t)
+        t += timedelta(minutes=timeframe_minutes)
+    return slots
+
+
+def _stepping_assign(signals, timeframe_minutes, base_window_hours, reference):
+    window_hours_used = max(1, int(base_window_hours))
+    slots = []
+    for h in (window_hours_used, 8, 12, 24):
+        slots = _stepping_slots(timeframe_minutes, int(h), reference)
+        if len(slots) >= len(signals):
+            window_hours_used = int(h)
+            break
+
+    used_hhmm = set()
+    assigned = []
+    slot_index = 0
+    for sinal in signals:
+        while slot_index < len(slots) and slots[slot_index].strftime('%H:%M') in used_hhmm:
+            slot_index += 1
+        if slot_index >= len(slots):
+            slots.extend(_stepping_slots(timeframe_minutes, 24, reference + timedelta(hours=window_hours_used)))
+        hhmm = slots[slot_index].strftime('%H:%M')
+        used_hhmm.add(hhmm)
+        assigned.append(replace(sinal, hhmm=hhmm))
+        slot_index += 1
+
+    return assigned, window_hours_used
+
+
+TIMEFRAMES = (1, 2, 3, 5, 7, 15, 30, 45, 60)
+DAY = datetime(2024, 3, 6, tzinfo=fs.LOCAL_TZ)
+# Every 7th minute of the day (covers all minute-of-hour residues and the day rollover),
+# exactly on the minute and part-way through it.
+REFERENCES = [
+    DAY + timedelta(minutes=m, seconds=s)
+    for m in range(0, 1440, 7)
+    for s in (0, 29.5)
+]
+
+
+@pytest.mark.parametrize("timeframe", TIMEFRAMES)
+@pytest.mark.parametrize("hours", (1, 5, 8, 12, 24))
+def test_slot_minutes_match_stepping(timeframe, hours):
+    for reference in REFERENCES:
+        minuto = reference.hour * 60 + reference.minute
+        esperado = [(t - DAY).total_seconds() // 60 for t in _stepping_slots(timeframe, hours, reference)]
+        assert list(fs._future_slot_minutes(timeframe, hours, minuto)) == esperado, reference
+
+
+@pytest.mark.parametrize("timeframe", (1, 5, 15, 30, 60))
+@pytest.mark.parametrize("count", (3, 10, 61, 300))
+def test_assignment_matches_stepping(timeframe, count):
+    signals = [
+        fs.Signal("EURUSD", timeframe, fs.HHMM_LABELS[(i * 37) % 1440], "CALL" if i % 2 else "PUT")
+        for i in range(count)
+    ]
+    for reference in REFERENCES[::20]:
+        assert fs._assign_signals_to_future_slots(signals, timeframe, 5, reference) == \
+            _stepping_assign(signals, timeframe, 5, reference), reference
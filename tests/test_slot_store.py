@@ -0,0 +1,78 @@
+import asyncio
+import random
+import time
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("BinaryOptionsToolsV2")
+
+import future_signal as fs
+
+START = int(datetime(2024, 3, 6, 6, 2, 30, tzinfo=timezone.utc).timestamp())
+FLAT_FROM = START + 3600
+
+
+class ClockSession:
+    """PocketOption stand-in on a test clock; the regular EURUSD feed is flat from FLAT_FROM on."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    async def get_candles(self, symbol, period, offset):
+        self.calls.append((symbol, offset))
+        end = self.clock[0] // period * period
+        flat = symbol == "EURUSD" and self.clock[0] >= FLAT_FROM
+        candles = []
+        for i in range(int(offset) // period, 0, -1):
+            ts = end - i * period
+            rng = random.Random(f"{symbol}:{ts}")
+            o = 1.0 + rng.random() / 100
+            if flat:
+                c = h = l = o
+            else:
+                lean = random.Random(f"{symbol}:{(ts // 60) % 1440}").random()
+                c = o + (0.001 if rng.random() < lean else -0.001)
+                h, l = max(o, c) + 0.0001, min(o, c) - 0.0001
+            candles.append({
+                "time": datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "open": o, "close": c, "high": h, "low": l,
+            })
+        candles.reverse()  # newest first, like the API
+        return candles
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [START]
+    monkeypatch.setattr(fs, "time", types.SimpleNamespace(
+        time=lambda: now[0], monotonic=time.monotonic, sleep=time.sleep,
+    ))
+    return now
+
+
+def _catalog(session, feeds, slot_stats=None):
+    ctx = fs.CatalogContext()
+    used = asyncio.run(fs.cataloga(ctx, session, "EURUSD", 5, 3, 1, feeds=feeds, slot_stats=slot_stats))
+    return used, ctx.catalogacao
+
+
+def test_store_follows_the_feed_when_the_regular_symbol_goes_flat(clock, tmp_path):
+    plain = ClockSession(clock), fs.FeedPreference()
+    stored = ClockSession(clock), fs.FeedPreference(), fs.SlotStatsStore(str(tmp_path / "slots.db"))
+
+    # Every 10 minutes for 8 hours; the regular feed goes flat after the first hour.
+    for _ in range(48):
+        esperado = _catalog(*plain)
+        assert _catalog(*stored) == esperado
+        clock[0] += 600
+
+    assert esperado[0] == "EURUSD_otc"
+    # Once on the _otc store, a request only downloads the newest bars.
+    stored[0].calls.clear()
+    clock[0] += 600
+    assert _catalog(*stored)[0] == "EURUSD_otc"
+    assert stored[0].calls
+    assert all(offset < fs._candle_window(5, 3, 1)[1] for _, offset in stored[0].calls)